@@ -0,0 +1,305 @@
+# Import sys, used to read the options the benchmark is started with
+import sys
+
+# Import os, used to make and find the files of the benchmark's database
+import os
+
+# Import io, used to throw away what the tables print whilst they are timed
+import io
+
+# Import json, used to write the results so they can be compared between versions
+import json
+
+# Import time, used to time each operation
+import time
+
+# Import random, used to make the synthetic records
+import random
+
+# Import shutil, used to remove the benchmark's database once it is finished with
+import shutil
+
+# Import tempfile, used to make a folder for the benchmark's database, so the real database is never touched
+import tempfile
+
+# Import contextlib, used to stop the tables printing whilst they are timed
+import contextlib
+
+# Import platform, used to record the system the benchmark was run on
+import platform
+
+# Import the database, which is only started when main.py is run, so it can be imported here
+import main
+
+#
+# SYNTHETIC DATA
+#
+
+# The words the synthetic names, addresses and text are made from
+firstNames = ["Oliver", "Amelia", "George", "Isla", "Harry", "Ava", "Noah", "Mia", "Jack", "Ivy", "Leo", "Grace"]
+lastNames = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson", "Davies", "Patel", "Wright"]
+streets = ["High Street", "Station Road", "Church Lane", "Park Avenue", "Mill Road", "Victoria Street"]
+places = ["London", "Leeds", "York", "Bristol", "Bath", "Derby", "Hull", "Leicester"]
+words = ["screen", "keyboard", "mouse", "cable", "drive", "fan", "charger", "battery", "speaker", "case"]
+
+# The positions of the staff, which are the only positions the position format check accepts
+positions = ["Manager", "Counter Attendant", "Repairman", "Maintenance"]
+
+# This function makes a date in the format dd/mm/yy, which is always a valid day of its month
+def randomDate():
+    return f"{random.randint(1, 28):02d}/{random.randint(1, 12):02d}/{random.randint(0, 99):02d}"
+
+# This function makes a time in the format HH:MM
+def randomTime():
+    return f"{random.randint(0, 23):02d}:{random.randint(0, 59):02d}"
+
+# This function makes a telephone number of 11 digits
+def randomPhone():
+    return "07" + "".join([str(random.randint(0, 9)) for digit in range(9)])
+
+# This function makes an email address, using the record's number so that it is short enough for the field
+def randomEmail(recordNum):
+    return f"{random.choice(firstNames).lower()}{recordNum}@mail.com"
+
+# This function makes a home address with a house number, street, place and postcode
+def randomAddress():
+    postcode = f"{random.choice(['LS', 'YO', 'M', 'B'])}{random.randint(1, 9)} {random.randint(1, 9)}{random.choice(['AB', 'XY', 'QT'])}"
+    return f"{random.randint(1, 999)} {random.choice(streets)} {random.choice(places)} {postcode}"
+
+# This function makes a number that fits the range and the max length of a field, as the text it is stored as
+def randomNumber(fieldType, maxLength, maxRange):
+
+    # A float keeps one digit after the decimal point, which takes two characters of its length
+    if (fieldType is float):
+        return f"{random.randint(0, min(maxRange, 10 ** (maxLength - 2) - 1))}.5"
+
+    return str(random.randint(0, min(maxRange, 10 ** maxLength - 1)))
+
+# This function makes a value for a field of a table, from the table's compiled schema, which passes every check of the
+# field. A foreign key is one of the IDs already made in the table it refers to, and a field with a unique index is
+# made unique with the record's number
+def randomValue(schema, field, recordNum, tableIDs):
+
+    fieldFormat = field.validation
+
+    if (field.keyType == "F"):
+        return random.choice(tableIDs[field.referencedTable])
+
+    if (field.fieldType is bool):
+        return random.choice(["0", "1"])
+
+    if (fieldFormat != "" and fieldFormat[0] == "range"):
+        return randomNumber(field.fieldType, field.maxLength, fieldFormat[1])
+
+    if (fieldFormat != "" and fieldFormat[0] == "format"):
+        return {"name": lambda: random.choice(firstNames if "first" in field.name.lower() else lastNames),
+                "phone": randomPhone,
+                "email": lambda: randomEmail(recordNum),
+                "address": randomAddress,
+                "position": lambda: random.choice(positions),
+                "date": randomDate,
+                "time": randomTime}[fieldFormat[1]]()
+
+    if (schema.indexedFields.get(field.position, ["", ""])[1] == "unique"):
+        return f"{field.name}{recordNum}"[:field.maxLength]
+
+    return " ".join(random.sample(words, 3))[:field.maxLength]
+
+# This function gets the order the tables are filled in, so that every table a foreign key refers to is filled before
+# the tables that refer to it
+def tableOrder():
+
+    order = []
+    while (len(order) < len(main.Table.schemaTables)):
+        for tableNum, schema in main.Table.schemaTables.items():
+            references = [field.referencedTable for field in schema.fields if field.keyType == "F"]
+            if (tableNum not in order and all([reference in order for reference in references])):
+                order.append(tableNum)
+
+    return order
+
+# This function fills every table with synthetic records, with the scale being the number of records in the whole
+# database, shared between the tables. The records of each table are created together in a single write. It returns
+# the IDs made in each table
+def generateDatabase(scale):
+
+    tableIDs = {}
+    for tableNum in tableOrder():
+        table = main.Table(tableNum)
+        recordsFields = [[randomValue(table.schema, field, recordNum, tableIDs) for field in table.schema.fields[1:]]
+                         for recordNum in range(max(1, scale // len(main.Table.schemaTables)))]
+
+        tableIDs[tableNum] = table.createRecords(recordsFields)
+        if (tableIDs[tableNum] is None):
+            raise ValueError(f"The synthetic records of {table.tableName} were not valid.")
+
+    return tableIDs
+
+#
+# TIMING
+#
+
+# This function times an operation, running it once for each of the arguments given. Anything it prints is thrown
+# away, so the time taken to print to the console isn't measured. It returns the number of runs and the total, mean,
+# fastest and slowest times in seconds
+def timeOperation(operation, argumentsList):
+
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for arguments in argumentsList:
+            start = time.perf_counter()
+            operation(*arguments)
+            times.append(time.perf_counter() - start)
+
+    return {"runs": len(times), "total": sum(times), "mean": sum(times) / len(times), "min": min(times), "max": max(times)}
+
+# This function reads the whole database into the cache again, as a terminal does when it starts or when another
+# terminal has changed the database
+def reloadDatabase(table):
+    main.Table.databaseCache["stamp"] = None
+    table.tableLength()
+
+# This function runs the benchmark at a single scale, in a new folder, and returns its results. Each operation is run
+# on the table that is benchmarked, repeats times, with a different random record each time
+def runScale(scale, repeats, tableName):
+
+    folder = tempfile.mkdtemp()
+    workingFolder = os.getcwd()
+    os.chdir(folder)
+
+    # The cache is emptied, as it belongs to the process rather than to a folder
+    main.Table.databaseCache["stamp"] = None
+
+    try:
+        start = time.perf_counter()
+        allIDs = generateDatabase(scale)
+        generateTime = time.perf_counter() - start
+
+        # The journal is written into the database, so every scale starts from the same layout
+        main.Table(0).compactDatabase()
+
+        table = main.Table(tableName)
+        fields = table.schema.fields
+        tableIDs = allIDs[table.tableNum]
+        with open(main.Table.databaseFile, "r") as databaseFile:
+            databaseText = databaseFile.read()
+
+        # A field without an index, to compare a search through the table with a look up in an index
+        unindexedField = [field for field in fields[1:] if field.position not in table.schema.indexedFields][0]
+
+        operations = {}
+
+        # Reading and decrypting the whole database, as a terminal does when it starts or the database was changed
+        operations["loadDatabase"] = timeOperation(reloadDatabase, [(table,)] * max(1, repeats // 10))
+
+        findArguments = [(fields[0].name, random.choice(tableIDs)) for repeat in range(repeats)]
+        operations["findRecord"] = timeOperation(table.findRecord, findArguments)
+        unindexedArguments = [(unindexedField.name, randomValue(table.schema, unindexedField, 0, {}))
+                              for repeat in range(repeats)]
+        operations["findRecordUnindexed"] = timeOperation(table.findRecord, unindexedArguments)
+        existenceArguments = [(random.choice(tableIDs),) for repeat in range(repeats)]
+        operations["verifyRecordExistence"] = timeOperation(table.verifyRecordExistence, existenceArguments)
+        operations["listToViewable"] = timeOperation(table.listToViewable, [()] * max(1, repeats // 10))
+
+        # The changes are made after the searches, so the searches are all made on the same table
+        createArguments = [([randomValue(table.schema, field, scale + repeat, allIDs) for field in fields[1:]],)
+                           for repeat in range(repeats)]
+        operations["createRecord"] = timeOperation(table.createRecord, createArguments)
+        amendArguments = [(random.randrange(table.tableLength()), unindexedField.name,
+                           randomValue(table.schema, unindexedField, 0, {})) for repeat in range(repeats)]
+        operations["amendRecord"] = timeOperation(table.amendRecord, amendArguments)
+        operations["deleteRecord"] = timeOperation(lambda: table.deleteRecord(random.randrange(table.tableLength())),
+                                                   [()] * repeats)
+
+        operations["backup"] = timeOperation(main.backup, [()] * max(1, repeats // 10))
+
+        # Encrypting and decrypting the whole database text, which every read and write of the database does. The
+        # cipher is private to the Table class, so it is reached through its mangled name
+        cipherText = main.Table._Table__encryption(databaseText)
+        operations["encryption"] = timeOperation(main.Table._Table__encryption,
+                                                 [(databaseText,)] * max(1, repeats // 10))
+        operations["decryption"] = timeOperation(main.Table._Table__decryption,
+                                                 [(cipherText,)] * max(1, repeats // 10))
+
+        return {"scale": scale, "table": tableName, "repeats": repeats,
+                "records": {schema.name: main.Table(tableNum).tableLength()
+                            for tableNum, schema in main.Table.schemaTables.items()},
+                "databaseBytes": os.path.getsize(main.Table.databaseFile), "generateSeconds": generateTime,
+                "operations": operations}
+    finally:
+        os.chdir(workingFolder)
+        shutil.rmtree(folder, ignore_errors=True)
+        main.Table.databaseCache["stamp"] = None
+
+# This function compares the results of the benchmark with the results of an earlier run, such as from an older version,
+# printing how much the mean time of each operation has changed at each scale both were run at
+def compareResults(results, earlierResults):
+
+    earlierScales = {result["scale"]: result for result in earlierResults["results"]}
+    for result in results["results"]:
+        if (result["scale"] not in earlierScales):
+            continue
+
+        print(f"Scale {result['scale']} ({earlierResults['label']} -> {results['label']}):")
+        for operation, timing in result["operations"].items():
+            earlierTiming = earlierScales[result["scale"]]["operations"].get(operation)
+            if (earlierTiming is None or earlierTiming["mean"] == 0):
+                continue
+
+            change = (timing["mean"] - earlierTiming["mean"]) / earlierTiming["mean"] * 100
+            print(f"  {operation}: {earlierTiming['mean'] * 1000:.3f}ms -> {timing['mean'] * 1000:.3f}ms ({change:+.1f}%)")
+
+# The benchmark is run with the scales to run at (the number of records in the whole database), and these options:
+# --repeats N, the number of times each operation is run at each scale
+# --table NAME, the table the operations are run on
+# --label NAME, the name of the version being benchmarked, which is kept in the results
+# --output FILE, the file the results are written to as JSON
+# --compare FILE, the results of an earlier run to compare these results with
+# For example: python benchmark.py 1000 10000 100000 --label new --output new.json --compare old.json
+def runBenchmark(arguments):
+
+    options = {"--repeats": "100", "--table": "Customer Details", "--label": "current", "--output": "benchmark.json",
+               "--compare": None}
+    scales = []
+
+    argumentNum = 0
+    while (argumentNum < len(arguments)):
+        if (arguments[argumentNum] in options and argumentNum + 1 < len(arguments)):
+            options[arguments[argumentNum]] = arguments[argumentNum + 1]
+            argumentNum += 2
+        elif (arguments[argumentNum].isdigit()):
+            scales.append(int(arguments[argumentNum]))
+            argumentNum += 1
+        else:
+            return print(f"Unknown option {arguments[argumentNum]}.")
+
+    # Without any scales, the benchmark runs from a thousand up to a million records
+    if (len(scales) == 0):
+        scales = [1000, 10000, 100000, 1000000]
+
+    # The same synthetic records are made every time, so runs of different versions can be compared
+    random.seed(0)
+
+    results = {"label": options["--label"], "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+               "python": platform.python_version(), "platform": platform.platform(), "results": []}
+
+    for scale in scales:
+        print(f"Running the benchmark with {scale} records...")
+        results["results"].append(runScale(scale, int(options["--repeats"]), options["--table"]))
+
+        for operation, timing in results["results"][-1]["operations"].items():
+            print(f"  {operation}: {timing['mean'] * 1000:.3f}ms")
+
+        # The results are written after each scale, so the results so far are kept if a larger scale is stopped
+        with open(options["--output"], "w") as resultsFile:
+            json.dump(results, resultsFile, indent=2)
+
+    print(f"Results written to {options['--output']}.")
+
+    if (options["--compare"] is not None):
+        with open(options["--compare"], "r") as earlierFile:
+            compareResults(results, json.load(earlierFile))
+
+# Start the benchmark, with the options it was run with
+if (__name__ == "__main__"):
+    runBenchmark(sys.argv[1:])
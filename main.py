@@ -1,10 +1,261 @@
 # Import regex, used for the validation functions
 import re
 
+# Import os, used to check the database file's modification time and size for the cache
+import os
+
+# Import bisect, used to keep the positions in the indexes in order
+import bisect
+
+# Import mmap, used to read a single table's segment of the segment file without reading the rest of the file
+import mmap
+
+# Import itertools, used to take a single page of records without reading the rest of the table
+import itertools
+
+# Import hashlib, used to name each block of a backup by its contents, so that unchanged blocks are only stored once
+import hashlib
+
+# Import zlib, used to compress the blocks of the backups
+import zlib
+
+# Import time, used to show when each backup was made
+import time
+
+# Import contextlib, used to make a transaction that can be used in a with statement
+import contextlib
+
+# Import sys, used to read the options the program is started with
+import sys
+
+# Import io, used to collect what the database server prints, so it can be sent to the terminal that asked for it
+import io
+
+# Import json, used to send the requests and their results between the database server and the terminals
+import json
+
+# Import socket, used by a terminal to connect to the database server
+import socket
+
+# Import asyncio, used by the database server to serve many terminals at once
+import asyncio
+
+# Import atexit, used to print the profile of the program's operations when it closes
+import atexit
+
+# Import http.server and threading, used to serve the metrics of the program's operations whilst it runs
+import http.server
+import threading
+
+# Import fcntl, used to lock the database so that several terminals can share it. It is only available on Unix, so on
+# other systems the database is not locked
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 #
 # DATABASE AND TABLES
 #
 
+# The TableRow class is what each table's record class is made from, using the fields of the table.
+# A record keeps each of its values in a slot named after its field, converted to the type of the field once when the
+# database is read, rather than as a list of text that has to be converted every time a value is compared.
+# It can still be used like the list of text it replaces, as indexing or looping through it gives the text of each value.
+# A record can't be changed once it is made, as the same record is kept in the cache and its indexes, and given out by
+# the methods that find records. A record is changed by replacing it with a new one
+
+class TableRow():
+
+    # A record has no dictionary of attributes, only the slots of its table's fields, which saves memory
+    __slots__ = ()
+
+    # The table the record belongs to, and the names and types of the table's fields, which are set in the record
+    # class made for each table
+    tableNum = None
+    fieldNames = ()
+    fieldTypes = ()
+
+    # Instantiates the record from the text of each of its values
+    def __init__(self, values):
+        for fieldName, fieldType, value in zip(self.fieldNames, self.fieldTypes, values):
+            object.__setattr__(self, fieldName, TableRow.decode(value, fieldType))
+
+    # The values of a record can't be changed or removed after it is made
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Records cannot be changed, so {name} cannot be set.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Records cannot be changed, so {name} cannot be removed.")
+
+    # This method converts the text of a value to the type of its field. If the value can't be converted, or the text
+    # would change when it is converted back (such as "007" or "2" in a float field), the text is kept instead
+    @staticmethod
+    def decode(text, fieldType):
+        try:
+            if (fieldType is bool and text in ["0", "1"]):
+                return text == "1"
+
+            if (fieldType is int or fieldType is float):
+                value = fieldType(text)
+                if (TableRow.encode(value) == text):
+                    return value
+        except ValueError:
+            pass
+
+        return text
+
+    # This method converts a value back to the text it is stored as in the database
+    @staticmethod
+    def encode(value):
+        if (type(value) is bool):
+            return "1" if value else "0"
+
+        return str(value)
+
+    # This method gets a value in the type of its field, by the index of the field
+    def typedValue(self, fieldIndex):
+        return getattr(self, self.fieldNames[fieldIndex])
+
+    # Indexing a record gives the text of the value, like the list of text it replaces
+    def __getitem__(self, fieldIndex):
+        if (type(fieldIndex) is slice):
+            return list(self)[fieldIndex]
+
+        return TableRow.encode(getattr(self, self.fieldNames[fieldIndex]))
+
+    def __len__(self):
+        return len(self.fieldNames)
+
+    def __iter__(self):
+        for fieldName in self.fieldNames:
+            yield TableRow.encode(getattr(self, fieldName))
+
+    # A record is equal to another record, or a list, with the same text
+    def __eq__(self, other):
+        if (isinstance(other, (TableRow, list))):
+            return list(self) == list(other)
+
+        return NotImplemented
+
+    # A record is equal to a list with the same text, which can't be a dictionary key, so neither can a record
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+# The SchemaField class is a field of a table, compiled from the field's properties in enumOfTableData once when the
+# program starts, so that the properties are named rather than looked up by their position in a list each time they
+# are used. It also holds the chain of checks a value of the field has to pass, in the order they are made
+
+class SchemaField():
+
+    __slots__ = ("name", "position", "keyType", "fieldType", "maxLength", "defaultValue", "validation", "required",
+                 "referencedTable", "emptyValue", "checks")
+
+    # Compiles the field from its position in the table and its name and properties in enumOfTableData
+    def __init__(self, position, fieldData):
+
+        self.name = fieldData[0]
+        self.position = position
+        self.keyType, self.fieldType, self.maxLength, self.defaultValue, self.validation, self.required = fieldData[1][:6]
+
+        # The number of the table a foreign key refers to, which is linked once every table has been compiled
+        self.referencedTable = None
+
+        # The value used when the field is left empty: its default value, or "None" if it isn't required. A required
+        # field without a default value has to be given, so it is None
+        if (self.defaultValue != ""):
+            self.emptyValue = str(self.defaultValue)
+        elif (self.required == False):
+            self.emptyValue = "None"
+        else:
+            self.emptyValue = None
+
+        # Each check is its name, which is shown to the user if it fails, and the function that makes it. The functions
+        # are chosen for the field's type and format here, so a value is checked without deciding which check to make
+        self.checks = []
+
+        # Check that the type is correct. Any value can be text, so text fields have no type check
+        if (self.fieldType is not str):
+            self.checks.append(["Type", typeChecks[self.fieldType]])
+
+        # Check that the length is within the max length
+        if (self.maxLength != ""):
+            maxLength = self.maxLength
+            self.checks.append(["Length", lambda value: lengthCheck(value, maxLength)])
+
+        # Additional validation, with the field's format check or range check
+        if (self.validation != "" and self.validation[0] == "format"):
+            self.checks.append(["Format", formatChecks[self.validation[1]]])
+
+        if (self.validation != "" and self.validation[0] == "range"):
+            fieldType, maxRange = self.fieldType, self.validation[1]
+            self.checks.append(["Range", lambda value: rangeCheck(fieldType(value), maxRange)])
+
+    # This method runs the field's checks on a value, stopping at the first that fails. It returns the name of the
+    # check that failed, or None if the value passed all of them. A foreign key is checked first, to make sure that the
+    # primary key exists, with keyExists if it is given (a batch of records looks the keys up in an index it has got
+    # once), or otherwise by looking it up in the table it refers to
+    def validate(self, value, keyExists=None):
+
+        if (self.keyType == "F"):
+            if (keyExists is None):
+                keyExists = lambda value: foreignKeyCheck(value, self.name)
+
+            if (keyExists(value) == False):
+                return "Key"
+
+        for checkName, check in self.checks:
+            if (check(value) == False):
+                return checkName
+
+        return None
+
+    # This method converts a value of a field with a range into the text of its number, as it is after it is checked
+    # (so "007" becomes "7"). The values of other fields are kept as they are
+    def normalise(self, value):
+
+        if (self.validation != "" and self.validation[0] == "range"):
+            return str(self.fieldType(value))
+
+        return value
+
+# The SchemaTable class is a table compiled from enumOfTableData, with its fields, the position of each field by its
+# name, the fields that have an index and how each index is declared, and the foreign keys of other tables that refer
+# to its primary key
+
+class SchemaTable():
+
+    __slots__ = ("tableNum", "name", "fields", "fieldNames", "fieldIndexes", "fieldTypes", "indexedFields", "dependents")
+
+    # Compiles the table from its number and its data in enumOfTableData
+    def __init__(self, tableNum, data):
+
+        self.tableNum = tableNum
+        self.name = data["name"]
+        self.fields = [SchemaField(position, fieldData) for position, fieldData in enumerate(data["fields"])]
+        self.fieldNames = [field.name for field in self.fields]
+        self.fieldIndexes = {field.name: field.position for field in self.fields}
+        self.fieldTypes = tuple([field.fieldType for field in self.fields])
+
+        # The primary key always has a unique hash index, foreign keys have a hash index unless another index is
+        # declared for them, and the other fields have the index declared for them
+        self.indexedFields = {0: ["hash", "unique"]}
+        for position, fieldData in enumerate(data["fields"]):
+            if (fieldData[1][6] != ""):
+                self.indexedFields[position] = fieldData[1][6]
+            elif (fieldData[1][0] == "F"):
+                self.indexedFields[position] = ["hash", "multiple"]
+
+        # The number of each table, and the name of its field, that refers to this table's primary key, which are
+        # linked once every table has been compiled
+        self.dependents = []
+
+    # This method gets a field of the table by its name
+    def field(self, fieldName):
+        return self.fields[self.fieldIndexes[fieldName]]
+
 # The Table class, which contains all the manipulating of the database structure
 # It contains the creating, deleting, and amending of records, where the data in the text file is encrypted
 
@@ -19,407 +270,2376 @@ class Table():
     # "The max length of the field",
     # "The default value of field",
     # "Any additional format checks",
-    # "And is it required?"]
+    # "Is it required?",
+    # "And does it have an index?"]
+
+    # An index is declared as ["hash" or "sorted", "unique" or "multiple"]. Both kinds find records by a value without
+    # searching through the whole table, a sorted index can also find records between two values, and a unique index
+    # stops two records from having the same value. A primary key always has a unique hash index, and a foreign key
+    # without a declared index has a hash index, so the records that refer to another record can be found quickly
 
     # These are for each table
     enumOfTableData = {
         0: {"name": "Staff Details",
             "fields": [
-                       ["staffID", ["P", int, "", "", "", True]],
-                       ["staffFirstName", ["", str, 30, "", ["format", "name"], True]],
-                       ["staffLastName", ["", str, 30, "", ["format", "name"], True]],
-                       ["telephoneNum", ["", str, 11, "", ["format", "phone"], True]],
-                       ["emailAddress", ["", str, 30, "", ["format", "email"], True]],
-                       ["homeAddress", ["", str, 50, "", ["format", "address"], True]],
-                       ["position", ["", str, 20, "", ["format", "position"], True]],
-                       ["workingHours", ["", int, 3, "", ["range", 168], True]],
-                       ["salary", ["", int, 5, "", ["range", 99999], True]]
+                       ["staffID", ["P", int, "", "", "", True, ""]],
+                       ["staffFirstName", ["", str, 30, "", ["format", "name"], True, ""]],
+                       ["staffLastName", ["", str, 30, "", ["format", "name"], True, ""]],
+                       ["telephoneNum", ["", str, 11, "", ["format", "phone"], True, ""]],
+                       ["emailAddress", ["", str, 30, "", ["format", "email"], True, ""]],
+                       ["homeAddress", ["", str, 50, "", ["format", "address"], True, ""]],
+                       ["position", ["", str, 20, "", ["format", "position"], True, ""]],
+                       ["workingHours", ["", int, 3, "", ["range", 168], True, ""]],
+                       ["salary", ["", int, 5, "", ["range", 99999], True, ""]]
             ]},
         1: {"name": "Account Details",
             "fields": [
-                       ["accountID", ["P", int, "", "", "", True]],
-                       ["staffID", ["F", int, "", "", "", True]],
-                       ["username", ["", str, 30, "", "", True]],
-                       ["password", ["", str, 20, "Password", "", True]]
+                       ["accountID", ["P", int, "", "", "", True, ""]],
+                       ["staffID", ["F", int, "", "", "", True, ""]],
+                       ["username", ["", str, 30, "", "", True, ["hash", "unique"]]],
+                       ["password", ["", str, 20, "Password", "", True, ""]]
             ]},
         2: {"name": "Computer Reservations",
             "fields": [
-                       ["computerReservationID", ["P", int, "", "", "", True]],
-                       ["customerID", ["F", int, "", "", "", True]],
-                       ["computerID", ["F", int, "", "", "", True]],
-                       ["dateOfUse", ["", str, 8, "", ["format", "date"], True]],
-                       ["timeOfUseStart", ["", str, 5, "", ["format", "time"], True]],
-                       ["timeOfUseEnd", ["", str, 5, "", ["format", "time"], True]],
-                       ["amountOfTime", ["", float, 4, "", ["range", 9999], True]],
-                       ["boolFinished", ["", bool, 1, 0, "", True]]
+                       ["computerReservationID", ["P", int, "", "", "", True, ""]],
+                       ["customerID", ["F", int, "", "", "", True, ["hash", "multiple"]]],
+                       ["computerID", ["F", int, "", "", "", True, ""]],
+                       ["dateOfUse", ["", str, 8, "", ["format", "date"], True, ["sorted", "multiple"]]],
+                       ["timeOfUseStart", ["", str, 5, "", ["format", "time"], True, ""]],
+                       ["timeOfUseEnd", ["", str, 5, "", ["format", "time"], True, ""]],
+                       ["amountOfTime", ["", float, 4, "", ["range", 9999], True, ""]],
+                       ["boolFinished", ["", bool, 1, 0, "", True, ""]]
             ]},
         3: {"name": "Computer Status",
             "fields": [
-                       ["computerID", ["P", int, "", "", "", True]],
-                       ["boolOperable", ["", bool, 1, 0, "", True]],
-                       ["boolMalware", ["", bool, 1, 0, "", True]],
-                       ["boolFullDrive", ["", bool, 1, 0, "", True]],
-                       ["comments", ["", str, 200, "", "", False]],
-                       ["date", ["", str, 8, "", ["format", "date"], True]]
+                       ["computerID", ["P", int, "", "", "", True, ""]],
+                       ["boolOperable", ["", bool, 1, 0, "", True, ""]],
+                       ["boolMalware", ["", bool, 1, 0, "", True, ""]],
+                       ["boolFullDrive", ["", bool, 1, 0, "", True, ""]],
+                       ["comments", ["", str, 200, "", "", False, ""]],
+                       ["date", ["", str, 8, "", ["format", "date"], True, ""]]
             ]},
         4: {"name": "Repair Reservations",
             "fields": [
-                       ["repairReservationID", ["P", int, "", "", "", True]],
-                       ["customerID", ["F", int, "", "", "", True]],
-                       ["dateOfReservation", ["", str, 8, "", ["format", "date"], True]],
-                       ["timeOfReservationStart", ["", str, 5, "", ["format", "time"], True]],
-                       ["timeOfReservationEnd", ["", str, 5, "", ["format", "time"], True]],
-                       ["device", ["", str, 40, "", "", True]],
-                       ["problems", ["", str, 100, "", "", True]],
-                       ["estimatedTimeToFix", ["", float, 3, "", ["range", 999], True]],
-                       ["boolFinished", ["", bool, 1, 0, "", True]]
+                       ["repairReservationID", ["P", int, "", "", "", True, ""]],
+                       ["customerID", ["F", int, "", "", "", True, ["hash", "multiple"]]],
+                       ["dateOfReservation", ["", str, 8, "", ["format", "date"], True, ["sorted", "multiple"]]],
+                       ["timeOfReservationStart", ["", str, 5, "", ["format", "time"], True, ""]],
+                       ["timeOfReservationEnd", ["", str, 5, "", ["format", "time"], True, ""]],
+                       ["device", ["", str, 40, "", "", True, ""]],
+                       ["problems", ["", str, 100, "", "", True, ""]],
+                       ["estimatedTimeToFix", ["", float, 3, "", ["range", 999], True, ""]],
+                       ["boolFinished", ["", bool, 1, 0, "", True, ""]]
             ]},
         5: {"name": "Stocks",
             "fields": [
-                       ["stockID", ["P", int, "", "", "", True]],
-                       ["stockName", ["", str, 20, "", "", True]],
-                       ["stockValue", ["", int, 4, 0, ["range", 9999], True]],
-                       ["warningValue", ["", int, 4, 0, ["range", 9999], True]],
-                       ["date", ["", str, 8, "", ["format", "date"], True]],
-                       ["approximateTime", ["", str, 5, "", ["format", "time"], True]],
-                       ["comments", ["", str, 200, "", "", False]]
+                       ["stockID", ["P", int, "", "", "", True, ""]],
+                       ["stockName", ["", str, 20, "", "", True, ["hash", "multiple"]]],
+                       ["stockValue", ["", int, 4, 0, ["range", 9999], True, ""]],
+                       ["warningValue", ["", int, 4, 0, ["range", 9999], True, ""]],
+                       ["date", ["", str, 8, "", ["format", "date"], True, ""]],
+                       ["approximateTime", ["", str, 5, "", ["format", "time"], True, ""]],
+                       ["comments", ["", str, 200, "", "", False, ""]]
             ]},
         6: {"name": "Customer Details",
             "fields": [
-                       ["customerID", ["P", int, "", "", "", True]],
-                       ["firstName", ["", str, 30, "", ["format", "name"], True]],
-                       ["lastName", ["", str, 30, "", ["format", "name"], True]],
-                       ["telephoneNum", ["", str, 11, "", ["format", "phone"], False]],
-                       ["emailAddress", ["", str, 30, "", ["format", "email"], False]],
-                       ["points", ["", int, 5, 0, ["range", 99999], True]]
+                       ["customerID", ["P", int, "", "", "", True, ""]],
+                       ["firstName", ["", str, 30, "", ["format", "name"], True, ""]],
+                       ["lastName", ["", str, 30, "", ["format", "name"], True, ""]],
+                       ["telephoneNum", ["", str, 11, "", ["format", "phone"], False, ""]],
+                       ["emailAddress", ["", str, 30, "", ["format", "email"], False, ""]],
+                       ["points", ["", int, 5, 0, ["range", 99999], True, ""]]
             ]},
         7: {"name": "Transaction History",
             "fields": [
-                       ["transactionID", ["P", int, "", "", "", True]],
-                       ["stockID", ["F", int, "", "", "", True]],
-                       ["accountID", ["F", int, "", "", "", True]],
-                       ["change", ["", str, 200, "", "", True]]
+                       ["transactionID", ["P", int, "", "", "", True, ""]],
+                       ["stockID", ["F", int, "", "", "", True, ""]],
+                       ["accountID", ["F", int, "", "", "", True, ""]],
+                       ["change", ["", str, 200, "", "", True, ""]]
             ]}
     }
 
+    # This represents the list of each character the encryption can convert to the cipher text
+    characters = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz1234567890 /:@.,#~\n'"
+
+    # The key is the variable that changes how the resultant cipher is made. The larger the value and variance in
+    # characters, the more secure it is
+    key = "T3OeM2aIXsDJp4LwPAgY"
+
+    # The precomputed translation tables for the encryption and decryption, built the first time they are needed
+    cipherTables = None
+
+    # The name of the text file the database is stored in
+    databaseFile = "db.txt"
+
+    # The name of the file the database is stored in when each table has its own segment, instead of the database file
+    segmentFile = "db_segments.txt"
+
+    # The name of the file the journal is kept in. Every change made to the database is written onto the end of the
+    # journal before it is treated as made, and the journal is applied on top of the database whenever it is read
+    journalFile = "db_journal.txt"
+
+    # The name of the folder the backups are kept in, the number of backups that are kept, and the largest number of
+    # bytes in each block of a backup
+    backupFolder = "backups"
+    backupCount = 5
+    backupBlockSize = 1 << 20
+
+    # The journal entries of the changes made in the transaction that is in progress, or None if there isn't one.
+    # Whilst a transaction is in progress, changes are only made to the cache, and are written to the journal together
+    # when the transaction is committed
+    transactionEntries = None
+
+    # The names of the lock files. The write lock is held by a terminal whilst it changes the database, so only one
+    # terminal changes it at a time. The read lock is shared by the terminals reading the files, and is only held
+    # on its own by a terminal whilst it swaps a newly written database in for the old one, which is quick, so reading
+    # is never held up by a long write
+    writeLockFile = "db_write.lock"
+    readLockFile = "db_read.lock"
+
+    # How long to wait before trying to take a lock again, which doubles each time up to the longest wait, and how long
+    # to keep trying before waiting for the lock without trying again
+    lockBackoff = 0.01
+    lockMaxBackoff = 0.5
+    lockTimeout = 10
+
+    # The open write lock file whilst this terminal holds the write lock, and how many times it has been taken without
+    # being released, as methods that change the database can call each other
+    writeLock = None
+    writeLockDepth = 0
+
+    # The address of the database server, which is the path of a Unix socket, or a host and port (such as
+    # "127.0.0.1:5050") on systems without Unix sockets. The server keeps the database in its cache for every terminal
+    # connected to it, so the database is only read and decrypted once
+    serverAddress = "db_server.sock" if hasattr(socket, "AF_UNIX") else "127.0.0.1:5050"
+
+    # The connection to the database server whilst this terminal uses one, or None if it uses the files itself
+    serverConnection = None
+
+    # The file the metrics of the operations are written to for a Prometheus textfile collector, the localhost port
+    # they are served on over HTTP, or None for either if they are not exported. They are set by the CAFE_METRICS_FILE
+    # and CAFE_METRICS_PORT environment variables. The file is written at most once every metricsInterval seconds,
+    # whilst operations are being run, and metricsWritten is when it was last written
+    metricsFile = os.environ.get("CAFE_METRICS_FILE") or None
+    metricsPort = int(os.environ["CAFE_METRICS_PORT"]) if os.environ.get("CAFE_METRICS_PORT", "").isdigit() else None
+    metricsInterval = 15
+    metricsWritten = 0
+
+    # Whether the operations of the tables are profiled, which is turned on by starting the program with the
+    # CAFE_PROFILE environment variable set to 1, or from the Statistics option of the Manager menu. Exporting the
+    # metrics also turns it on, as they are made from the profile
+    profiling = os.environ.get("CAFE_PROFILE", "0") not in ["", "0"] or metricsFile is not None or metricsPort is not None
+
+    # The profile of the operations whilst profiling is on. "operations" holds the number of calls and the total and
+    # longest time taken by each operation, and how many calls took under each of the profileBuckets (in milliseconds),
+    # or longer than the last of them. The counters are the bytes read from and written to the database files, the
+    # number of times a whole file (or segment) was decrypted or encrypted, the number of characters decrypted and
+    # encrypted in total, and the number of tables made
+    profileBuckets = [0.1, 1, 5, 10, 50, 100, 500, 1000]
+    profile = {"started": time.time(), "operations": {}, "bytesRead": 0, "bytesWritten": 0, "fileDecryptions": 0,
+               "fileEncryptions": 0, "decryptedCharacters": 0, "encryptedCharacters": 0, "instances": 0}
+
+    # A process-wide cache of the decrypted database, shared by every instance of the Table class.
+    # "stamp" is the modification time and size of the file and the journal when they were last read or written, which
+    # is used to detect if they have been edited outside of the cache, "format" is the storage format of the file,
+    # "preamble" holds any lines before the first table identifier,
+    # "sections" holds each table's identifier line and records in the order they appear in the file,
+    # "cipherLength" is the number of characters in the journal, which is where the next journal entry is encrypted from,
+    # "logEntries" is the number of entries in the journal (and in any log left at the end of the file),
+    # "pendingLog" holds the entries of the segmented tables that haven't been read yet,
+    # "generation" is the number of times the database has been written, which the journal is marked with,
+    # and "reading" is true whilst the files are being read into the cache
+    databaseCache = {"stamp": None, "format": "single", "cipherLength": 0, "preamble": [], "sections": [],
+                     "logEntries": 0, "pendingLog": {}, "generation": 0, "reading": False}
+
+    # The number of entries the log can reach before it is compacted back into the tables
+    logCompactionSize = 500
+
+    # The number of records shown on each page of a table
+    pageSize = 20
+
+    # The record class of each table, which are made the first time each table is used
+    rowClasses = {}
+
+    # The compiled schema of each table by its number, the number of each table by its name, and the number of the
+    # table each primary key field belongs to by the name of the field. They are compiled from enumOfTableData once,
+    # when the program starts
+    schemaTables = {}
+    schemaNames = {}
+    primaryKeyNames = {}
+
+    # The table that each primary key field belongs to, by the name of the field. Each table is made the first time a
+    # foreign key of it is checked, so checking a foreign key doesn't make a new table
+    primaryKeyTables = {}
+
+    # The tables and fields that refer to each primary key field as a foreign key, by the name of the primary key
+    # field. They are made from the schema the first time a record's dependents are found
+    foreignKeyFields = None
+
     # Instantiates the table, saving the table's id, name, fields, and unique identifier
     def __init__(self, tableIdentifier):
 
-        # If the tableIdentifier is a string, treat it as the name of the table, rather than its enum ID
+        # If the tableIdentifier is a string, treat it as the name of the table, rather than its enum ID, and look up
+        # its number by its name
         if (type(tableIdentifier) is str):
-
-            # Linearly search through enumOfTableData dictionary and compare the name of the table to the tableIdentifier
-            for id, data in Table.enumOfTableData.items():
-
-                # The table number is found
-                if data["name"] == tableIdentifier:
-                    self.tableNum = id
+            self.tableNum = Table.schemaNames[tableIdentifier]
         else:
             # If the tableIdentifier is not a string, then the tableIdentifier is the tableID in the enum,
             # therefore, assign it to self.tableNum
             self.tableNum = tableIdentifier
 
+        # Gets the table's compiled schema, which holds its fields and their properties
+        self.schema = Table.schemaTables[self.tableNum]
 
-        # Gets the table's name from the data, based on the id passed in
-        self.tableName = self.enumOfTableData[self.tableNum]['name']
-
-        # Gets the field data, which contains their properties
-        self.tableFieldData = self.enumOfTableData[self.tableNum]['fields']
+        # Gets the table's name, and the list of the names of its fields
+        self.tableName = self.schema.name
+        self.tableFields = self.schema.fieldNames
 
-        # Creates a list for each of the field names
-        self.tableFields = [x[0] for x in self.enumOfTableData[self.tableNum]['fields']]
+        Table.__count("instances")
 
         # In the sequential text file database, the table identifier serves as a header for where to and from the table
         # should read to gather their respective records.
         self.tableIdentifier = f"#~{self.tableNum}"
 
-        # This checks for if the database file exists in the directory, if not, create one, and finally close the file
+        # This checks for if the database file (or the segment file) exists in the directory, if not, create one. A
+        # terminal using the database server leaves the files to the server
+        if (Table.serverConnection is None and Table.storageFormat() == "single" and os.path.exists(Table.databaseFile) == False):
+            open(Table.databaseFile, "w").close()
+
+    # This method gets the table that a primary key field belongs to, by the name of the field, or None if no table
+    # has that field as its primary key
+    @staticmethod
+    def primaryKeyTable(field):
+
+        if (field not in Table.primaryKeyNames):
+            return None
+
+        if (field not in Table.primaryKeyTables):
+            Table.primaryKeyTables[field] = Table(Table.primaryKeyNames[field])
+
+        return Table.primaryKeyTables[field]
+
+    # This method gets the tables that have a field as a foreign key, as a list of each table and the field's name
+    @staticmethod
+    def foreignKeyTables(field):
+
+        if (Table.foreignKeyFields is None):
+            Table.foreignKeyFields = {}
+            for schema in Table.schemaTables.values():
+                Table.foreignKeyFields[schema.fieldNames[0]] = [[Table(tableNum), fieldName] for tableNum, fieldName in schema.dependents]
+
+        return Table.foreignKeyFields.get(field, [])
+
+    # This method compiles the schema of every table from enumOfTableData, and links each foreign key to the table it
+    # refers to, and each table to the foreign keys that refer to it
+    @staticmethod
+    def compileSchema():
+
+        Table.schemaTables = {tableNum: SchemaTable(tableNum, data) for tableNum, data in Table.enumOfTableData.items()}
+        Table.schemaNames = {schema.name: tableNum for tableNum, schema in Table.schemaTables.items()}
+        Table.primaryKeyNames = {schema.fieldNames[0]: tableNum for tableNum, schema in Table.schemaTables.items()}
+        Table.primaryKeyTables = {}
+        Table.foreignKeyFields = None
+
+        for schema in Table.schemaTables.values():
+            for field in schema.fields:
+                if (field.keyType == "F" and field.name in Table.primaryKeyNames):
+                    field.referencedTable = Table.primaryKeyNames[field.name]
+                    Table.schemaTables[field.referencedTable].dependents.append([schema.tableNum, field.name])
+
+    # This method gets the positions in the segment file where each part of it starts: the segments after the directory,
+    # and the log after the last segment. Each part can change without the others changing, so a backup splits the
+    # file into blocks at these positions
+    @staticmethod
+    def segmentBoundaries():
+
+        with open(Table.segmentFile, "rb") as file:
+            directory = file.readline()
+
+        boundaries = [len(directory)]
+        for segment in directory.decode("ascii").split()[1:]:
+            tableNum, offset, length = segment.split(":")[:3]
+            boundaries.append(len(directory) + int(offset))
+            boundaries.append(len(directory) + int(offset) + int(length))
+
+        return sorted(set(boundaries))
+
+    # This method gets which format the database is stored in. If the segment file exists, each table has its own
+    # segment in it, otherwise the whole database is in the single database file
+    @staticmethod
+    def storageFormat():
+        return "segmented" if os.path.exists(Table.segmentFile) else "single"
+
+    # This method gets the modification time and size of the database file and the journal, which together act as the
+    # database's 'version'. If any have changed since the cache was filled, the files were edited outside of the cache
+    @staticmethod
+    def __fileStamp(storageFormat=None):
+
+        storageFormat = Table.storageFormat() if storageFormat is None else storageFormat
         try:
-            file = open("db.txt")
-        except:
-            file = open("db.txt", "w")
-        finally:
+            fileStats = os.stat(Table.segmentFile if storageFormat == "segmented" else Table.databaseFile)
+        except OSError:
+            return None
+
+        # The journal only exists whilst it has changes that haven't been written into the database
+        try:
+            journalStats = os.stat(Table.journalFile)
+            journalStamp = (journalStats.st_mtime_ns, journalStats.st_size)
+        except OSError:
+            journalStamp = None
+
+        return (storageFormat, fileStats.st_mtime_ns, fileStats.st_size, journalStamp)
+
+    # This method splits a table identifier line into the identifier, the table number, and the table's sequence, which
+    # is the ID the next record created in the table is given. The sequence is written after the identifier as #~N:seq,
+    # and is None if it is missing
+    @staticmethod
+    def __splitIdentifier(databaseLine):
+
+        identifier, _, sequence = databaseLine.partition(":")
+        return identifier, identifier.split("#~")[1], int(sequence) if sequence.isdigit() else None
+
+    # This method makes the table identifier line of a section, with the table's sequence after it if it is known
+    @staticmethod
+    def __sectionHeader(section):
+        return section["identifier"] + ("" if section["sequence"] is None else f":{section['sequence']}")
+
+    # This method splits decrypted lines of the database into the lines before the first table identifier, and a
+    # section for each table identifier with the records that follow it
+    @staticmethod
+    def __splitSections(lines):
+
+        preamble = []
+        sections = []
+        for databaseLine in lines:
+            if ("#~" in databaseLine):
+                identifier, tableNum, sequence = Table.__splitIdentifier(databaseLine)
+                sections.append({"identifier": identifier,
+                                 "tableNum": tableNum,
+                                 "sequence": sequence,
+                                 "records": [],
+                                 "segment": None,
+                                 "indexes": {},
+                                 "sortedKeys": {},
+                                 "sortedViews": {}})
+            elif (len(sections) == 0):
+                preamble.append(databaseLine)
+            else:
+                # A single record which is decrypted
+                sections[-1]["records"].append(databaseLine.split(","))
+
+        return preamble, sections
+
+    # This function is used as a decorator on the operations that are profiled. Whilst profiling is on, the time each
+    # call takes is recorded under the name of the operation. The time of an operation includes the operations it calls
+    def __profiled(method):
+
+        def profiledMethod(*args, **kwargs):
+            if (Table.profiling == False):
+                return method(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                Table.__recordTime(method.__name__.lstrip("_"), time.perf_counter() - start)
+
+        profiledMethod.__name__ = method.__name__
+        profiledMethod.__doc__ = method.__doc__
+        return profiledMethod
+
+    # This method records the time a call of an operation took, in seconds
+    @staticmethod
+    def __recordTime(operationName, seconds):
+
+        operation = Table.profile["operations"].setdefault(operationName, {"calls": 0, "total": 0.0, "max": 0.0,
+                                                                          "histogram": [0] * (len(Table.profileBuckets) + 1)})
+        operation["calls"] += 1
+        operation["total"] += seconds
+        operation["max"] = max(operation["max"], seconds)
+        operation["histogram"][bisect.bisect_left(Table.profileBuckets, seconds * 1000)] += 1
+
+        # The metrics file is kept up to date whilst operations are run
+        if (Table.metricsFile is not None and time.time() - Table.metricsWritten >= Table.metricsInterval):
+            Table.writeMetrics()
+
+    # This method adds to one of the profile's counters, whilst profiling is on
+    @staticmethod
+    def __count(counter, amount=1):
+
+        if (Table.profiling):
+            Table.profile[counter] += amount
+
+    # This method returns the cached database, reading and decrypting the file only if the cache is empty or the file
+    # has been changed since it was last read or written
+    def __loadDatabase(self):
+
+        cache = Table.databaseCache
+
+        # If the file has not changed, the cache is still valid. Whilst the files are being read, the cache is used as
+        # it is, as another terminal may add to the journal whilst it is read, and the entries read are applied to it
+        if (cache["reading"]):
+            return cache
+
+        # Whilst this terminal holds the write lock (and it is a real lock), no other terminal can change the files, so
+        # once the cache has been checked after taking the lock, it doesn't need checking against the files again
+        if (cache["stamp"] is not None and (Table.writeLockDepth > 0 and fcntl is not None or cache["stamp"] == Table.__fileStamp())):
+            return cache
+
+        # The files are read whilst holding the read lock, so another terminal can't swap in a new database between
+        # reading the database and reading the journal
+        with Table.__readLock():
+            cache["reading"] = True
+            try:
+                return self.__readDatabase()
+            finally:
+                cache["reading"] = False
+
+    # This method reads the database and journal into the cache
+    @__profiled
+    def __readDatabase(self):
+
+        cache = Table.databaseCache
+        cache["stamp"] = Table.__fileStamp()
+        cache["format"] = Table.storageFormat()
+        cache["pendingLog"] = {}
+
+        # In the segmented format, only the directory, log and journal are read, and each table is read when it is
+        # first needed
+        if (cache["format"] == "segmented"):
+            return self.__loadSegmentDirectory()
+
+        # Open the database in readonly format
+        with open(Table.databaseFile, "r") as file:
+            cipher = file.read()
+
+        Table.__count("bytesRead", len(cipher))
+        Table.__count("fileDecryptions")
+
+        # Decrypts the database and converts it into a list of lines
+        file = self.__decryption(cipher).split("\n")
+
+        # If the file is empty, make the file list empty
+        file = [] if file == [""] else file
+
+        # Linearly searches from the first line, and every time a table identifier is found, start a new section
+        # for the records that follow it
+        preamble, sections = Table.__splitSections(file)
+
+        # The records of each table are made into the table's record class
+        for section in sections:
+            self.__makeRows(section)
+
+        cache["preamble"] = preamble
+        cache["sections"] = [section for section in sections if section["tableNum"] not in ["L", "G"]]
+        cache["logEntries"] = 0
+
+        # The generation of the database is written as the sequence of its own identifier, #~G
+        cache["generation"] = 0
+        for section in sections:
+            if (section["tableNum"] == "G" and section["sequence"] is not None):
+                cache["generation"] = section["sequence"]
+
+        # Applies the entries in the log, in the order they were written, to the records of the tables. The log is only
+        # at the end of the file if it was written before the journal was used
+        for section in sections:
+            if (section["tableNum"] == "L"):
+                cache["logEntries"] += len(section["records"])
+                self.__applyLogEntries(section["records"])
+
+        # Applies the entries in the journal, which are the changes made since the file was last written
+        self.__applyLogEntries(self.__loadJournal())
+
+        return cache
+
+    # This method reads and decrypts the journal, returning the number of characters in it, the generation of the
+    # database it was started on, and its entries
+    @__profiled
+    def __readJournal(self):
+
+        try:
+            with open(Table.journalFile, "rb") as file:
+                cipher = file.read().decode("ascii")
+        except OSError:
+            return 0, None, []
+
+        Table.__count("bytesRead", len(cipher))
+        Table.__count("fileDecryptions", 1 if cipher != "" else 0)
+
+        journalLines = self.__decryption(cipher).split("\n") if cipher != "" else []
+
+        # The first line of the journal is the generation of the database, #~G:generation
+        generation = None
+        if (len(journalLines) > 0 and "#~" in journalLines[0]):
+            generation = Table.__splitIdentifier(journalLines.pop(0))[2]
+
+        return len(cipher), generation, [journalLine.split(",") for journalLine in journalLines]
+
+    # This method reads the journal into the cache, and returns its entries.
+    # If the program was stopped after the database was written but before the journal was removed, the journal is
+    # from an older generation of the database, and its changes are already in the database, so it is ignored, and
+    # replaced the next time the journal is written
+    def __loadJournal(self):
+
+        cache = Table.databaseCache
+        cipherLength, generation, entries = self.__readJournal()
+
+        if (cipherLength > 0 and generation != cache["generation"]):
+            cipherLength, entries = 0, []
+
+        cache["cipherLength"] = cipherLength
+        cache["logEntries"] += len(entries)
+
+        return entries
+
+    # This method makes the records of a section into its table's record class
+    def __makeRows(self, section):
+        if (section["tableNum"].isdigit() and int(section["tableNum"]) in Table.enumOfTableData):
+            table = Table(int(section["tableNum"]))
+            section["records"] = [table.__makeRow(record) for record in section["records"]]
+
+    # This method reads the directory at the start of the segment file into the cache, without decrypting any table.
+    # The directory is a plain line listing each segment's table number, offset and length (and the table's sequence,
+    # if it is known), where the offset is counted from the end of the directory line. Each segment is encrypted on its own, so it can be decrypted without
+    # the rest of the file, and anything after the last segment is the log
+    def __loadSegmentDirectory(self):
+
+        cache = Table.databaseCache
+
+        with open(Table.segmentFile, "rb") as file:
+            directory = file.readline()
+            dataStart = len(directory)
+
+            sections = []
+            logStart = dataStart
+            # The first part of the directory is #SEGMENTS:generation
+            generation = directory.decode("ascii").split()[0].partition(":")[2]
+            cache["generation"] = int(generation) if generation.isdigit() else 0
+
+            for segment in directory.decode("ascii").split()[1:]:
+                tableNum, offset, length, sequence = (segment + ":").split(":")[:4]
+
+                # The records are not read until they are needed
+                sections.append({"identifier": f"#~{tableNum}",
+                                 "tableNum": tableNum,
+                                 "sequence": int(sequence) if sequence.isdigit() else None,
+                                 "records": None,
+                                 "segment": (dataStart + int(offset), int(length)),
+                                 "indexes": {},
+                                 "sortedKeys": {},
+                                 "sortedViews": {}})
+                logStart = max(logStart, dataStart + int(offset) + int(length))
+
+            # Decrypts the log, which is encrypted from the start of the log rather than the start of the file
+            file.seek(logStart)
+            logCipher = file.read().decode("ascii")
+
+        Table.__count("bytesRead", len(directory) + len(logCipher))
+        Table.__count("fileDecryptions", 1 if logCipher != "" else 0)
+
+        cache["preamble"] = []
+        cache["sections"] = [section for section in sections if section["tableNum"] != "P"]
+        cache["logEntries"] = 0
+
+        # The lines before the first table identifier are kept in a segment of their own
+        for section in sections:
+            if (section["tableNum"] == "P"):
+                cache["preamble"] = self.__readSegment(section)
+
+        # The log entries, followed by the journal entries, are kept until the table they belong to is read
+        logLines = self.__decryption(logCipher).split("\n") if logCipher != "" else []
+        entries = [entry for logSection in Table.__splitSections(logLines)[1] for entry in logSection["records"]]
+        cache["logEntries"] = len(entries)
+
+        for entry in entries + self.__loadJournal():
+            if (len(entry) > 1):
+                cache["pendingLog"].setdefault(entry[1], []).append(entry)
+
+        # A table that only has records in the log still needs a section for them
+        for tableNum in cache["pendingLog"]:
+            if (tableNum not in [section["tableNum"] for section in cache["sections"]]):
+                cache["sections"].append({"identifier": f"#~{tableNum}", "tableNum": tableNum, "sequence": None,
+                                          "records": None, "segment": None, "indexes": {}, "sortedKeys": {},
+                                          "sortedViews": {}})
+
+        return cache
+
+    # This method reads and decrypts the lines of a single segment, through a memory map of the segment file so that
+    # only the bytes of that segment are touched
+    # If another terminal has written a new segment file since the directory was read, None is returned
+    @__profiled
+    def __readSegment(self, section):
+
+        start, length = section["segment"]
+        if (length == 0):
+            return []
+
+        file = Table.__openSegmentFile()
+        if (file is None):
+            return None
+
+        with file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mappedFile:
+                cipher = mappedFile[start:start + length].decode("ascii")
+
+        Table.__count("bytesRead", length)
+        Table.__count("fileDecryptions")
+
+        return self.__decryption(cipher).split("\n")
+
+    # This method opens the segment file, or returns None if it is no longer the file the directory in the cache was read
+    # from. Once it is open, it can still be read even if another terminal swaps in a new segment file
+    @staticmethod
+    def __openSegmentFile():
+
+        file = open(Table.segmentFile, "rb")
+        fileStats = os.fstat(file.fileno())
+        stamp = Table.databaseCache["stamp"]
+
+        if (stamp is None or (fileStats.st_mtime_ns, fileStats.st_size) != (stamp[1], stamp[2])):
             file.close()
+            return None
+
+        return file
+
+    # This method reads the records of a section from its segment if they haven't been read yet, then applies the
+    # entries of the log that belong to its table. False is returned if the segment file has changed, so the section
+    # can't be read
+    def __loadSection(self, section):
+
+        if (section["records"] is not None):
+            return True
+
+        lines = [] if section["segment"] is None else self.__readSegment(section)
+        if (lines is None):
+            return False
+
+        # The first line of a table's segment is its identifier
+        if (len(lines) > 0):
+            section["identifier"], _, sequence = Table.__splitIdentifier(lines[0])
+            section["sequence"] = sequence if section["sequence"] is None else section["sequence"]
+
+        section["records"] = [databaseLine.split(",") for databaseLine in lines[1:]]
+        self.__makeRows(section)
+
+        # Whilst the entries are applied, the cache is used as it is, as it is with the rest of the log when the
+        # database is read. Otherwise, if another terminal added to the journal in the meantime, applying an entry would
+        # read the whole cache again, and the rest of the entries would be applied to sections that are no longer used
+        cache = Table.databaseCache
+        reading = cache["reading"]
+        cache["reading"] = True
+        try:
+            self.__applyLogEntries(cache["pendingLog"].pop(section["tableNum"], []))
+        finally:
+            cache["reading"] = reading
+
+        return True
+
+    # This method checks that an entry of the log was completely written. The last part of an entry is the length of
+    # the rest of the entry, so if the program was stopped whilst an entry was being written, it doesn't match
+    @staticmethod
+    def __validLogEntry(entry):
+        return len(entry) >= 3 and entry[-1] == str(len(",".join(entry[:-1])))
+
+    # This method applies entries of the log or journal to the cached database, in the order they were written. Removing
+    # a record moves the position of every record after it in the indexes, so a deleted record is only taken out of the
+    # indexes as its entry is applied, and the deleted records are removed from each table together at the end
+    def __applyLogEntries(self, entries):
+
+        deletions = {}
+        for entry in entries:
+            self.__applyLogEntry(entry, deletions)
+
+        for tableNum, positions in deletions.items():
+            Table(tableNum).__removeRecords(positions)
+
+    # This method applies a single entry of the log or journal to the cached database, ignoring unfinished entries.
+    # An entry is "C" with the created record, "D" with the primary key of the deleted record, or "A" with the primary
+    # key the amended record had, followed by the amended record. A deleted record is left in its table, but taken out
+    # of the indexes, and its position is added to the positions in deletions of the records deleted from its table
+    def __applyLogEntry(self, entry, deletions):
+
+        if (Table.__validLogEntry(entry) == False or entry[1].isdigit() == False or
+                int(entry[1]) not in Table.enumOfTableData):
+            return
+
+        table = Table(int(entry[1]))
+
+        # A created record is added to the end of its table. If a record with its ID is already there, the IDs in the
+        # table were out of step with its sequence when it was created, so it can't be added, and the user is told
+        if (entry[0] == "C" and table.__primaryKeyPosition(entry[2]) is None):
+            table.__insertRecord(entry[2:-1])
+
+        elif (entry[0] == "C"):
+            print(f"A record created in {table.tableName} was not loaded, as another record has its ID ({entry[2]}).")
+
+        # A deleted record is removed from its table, if it is still there
+        elif (entry[0] == "D" and table.__primaryKeyPosition(entry[2]) is not None):
+            position = table.__primaryKeyPosition(entry[2])
+            table.__hideRecord(position)
+            deletions.setdefault(table.tableNum, set()).add(position)
+
+        # An amended record replaces the record with its old primary key, if it is still there
+        elif (entry[0] == "A" and table.__primaryKeyPosition(entry[2]) is not None):
+            table.__replaceRecord(table.__primaryKeyPosition(entry[2]), entry[3:-1])
+
+    # This method gets the position of the record with a primary key in the table, or None if there isn't one
+    def __primaryKeyPosition(self, primaryKey):
+
+        positions = self.__getIndex(0).get(self.__indexKey(0, primaryKey), [])
+        return positions[0] if len(positions) > 0 else None
+
+    # This method writes a file next to the file it replaces, and makes sure it is on the disk. It is then renamed over
+    # the old file, so a crash whilst writing leaves the old file as it was, rather than half written
+    @staticmethod
+    def __writeTemporaryFile(fileName, parts, mode="w"):
+
+        with open(fileName + ".tmp", mode) as file:
+            for part in parts:
+                file.write(part)
+                Table.__count("bytesWritten", len(part))
+
+            file.flush()
+            os.fsync(file.fileno())
+
+    # This method makes sure that the names of the files in a file's folder are on the disk, so that a file that was
+    # created, renamed or removed is still that way after a power cut. Windows can't open a folder to do this, and
+    # writes the names itself, so it is skipped there
+    @staticmethod
+    def syncDirectory(fileName):
+
+        try:
+            folder = os.open(os.path.dirname(os.path.abspath(fileName)), os.O_RDONLY)
+        except OSError:
+            return
+
+        try:
+            os.fsync(folder)
+        finally:
+            os.close(folder)
+
+    # This method encrypts the cached database and writes the whole of it into the database file, in the canonical
+    # layout where the records are under their table identifiers and there is no log. This is the journal's checkpoint:
+    # once the database is written, the changes in the journal are in it, so the journal is removed
+    @__profiled
+    def __saveDatabase(self):
+
+        cache = Table.databaseCache
+        cache["generation"] += 1
+
+        if (cache["format"] == "segmented"):
+            self.__saveSegments()
+            databaseFile = Table.segmentFile
+        else:
+            self.__saveSingle()
+            databaseFile = Table.databaseFile
+
+        # The new database is swapped in for the old one, and the journal is only removed once the new database is
+        # safely in place, on the disk. No other terminal reads the files in between, so none of them see the new
+        # database with the old journal
+        with Table.__readLock(True):
+            os.replace(databaseFile + ".tmp", databaseFile)
+            Table.syncDirectory(databaseFile)
+            if (os.path.exists(Table.journalFile)):
+                os.remove(Table.journalFile)
+
+        # The cache now matches the files, so remember their new stamp
+        cache["stamp"] = Table.__fileStamp(cache["format"])
+        cache["cipherLength"] = 0
+        cache["logEntries"] = 0
+        cache["pendingLog"] = {}
+
+    # This method writes the cached database into the single database file
+    def __saveSingle(self):
+
+        cache = Table.databaseCache
+
+        # Converts the sections back into lines, with the table identifier above each table's records, after the
+        # generation of the database
+        databaseRecordsList = list(cache["preamble"]) + [f"#~G:{cache['generation']}"]
+        for section in cache["sections"]:
+            self.__loadSection(section)
+            databaseRecordsList.append(Table.__sectionHeader(section))
+            databaseRecordsList.extend([",".join(record) for record in section["records"]])
+
+        # Converts the list into a string with newlines
+        databaseRecordsPlain = "\n".join(databaseRecordsList)
+
+        # Write the whole list into the database
+        Table.__writeTemporaryFile(Table.databaseFile, [self.__encryption(databaseRecordsPlain)])
+        Table.__count("fileEncryptions")
+
+    # This method writes the cached database into the segment file, with no log. Only the tables that have been read
+    # are encrypted again; the segments of the other tables are copied across as they are.
+    # The new file is written next to the old one and then renamed over it, so the old file is never half written
+    def __saveSegments(self):
+
+        cache = Table.databaseCache
+
+        # Tables with entries in the log have to be read, as their segment no longer matches their records
+        for section in cache["sections"]:
+            if (section["tableNum"] in cache["pendingLog"]):
+                self.__loadSection(section)
+
+        preambleSection = {"tableNum": "P", "records": cache["preamble"], "segment": None}
+        segments = []
+        for section in ([preambleSection] if len(cache["preamble"]) > 0 else []) + cache["sections"]:
+            if (section["records"] is None):
+                segments.append([section, None])
+            elif (section["tableNum"] == "P"):
+                segments.append([section, self.__encryption("\n".join(section["records"])).encode("ascii")])
+            else:
+                segmentPlain = "\n".join([Table.__sectionHeader(section)] + [",".join(record) for record in section["records"]])
+                segments.append([section, self.__encryption(segmentPlain).encode("ascii")])
+
+            Table.__count("fileEncryptions", 1 if segments[-1][1] is not None else 0)
+
+        # The segments of the tables that haven't been read are copied from the old file through a memory map
+        if (None in [segment for section, segment in segments]):
+            with open(Table.segmentFile, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mappedFile:
+                    for segment in segments:
+                        if (segment[1] is None):
+                            start, length = segment[0]["segment"]
+                            segment[1] = bytes(mappedFile[start:start + length])
+                            Table.__count("bytesRead", length)
+
+        # The directory lists where each segment is, counted from the end of the directory
+        directory = f"#SEGMENTS:{cache['generation']}"
+        offset = 0
+        for section, segment in segments:
+            directory += f" {section['tableNum']}:{offset}:{len(segment)}"
+            if (section.get("sequence") is not None):
+                directory += f":{section['sequence']}"
+            offset += len(segment)
+        directory = (directory + "\n").encode("ascii")
+
+        Table.__writeTemporaryFile(Table.segmentFile, [directory] + [segment for section, segment in segments], "wb")
+
+        # Remembers where each segment now is, for the tables that haven't been read yet
+        offset = len(directory)
+        for section, segment in segments:
+            section["segment"] = (offset, len(segment))
+            offset += len(segment)
+
+    # This method opens a lock file and locks it, either shared with other terminals or on its own (exclusive). If the
+    # lock is held by another terminal, it tries again after a wait that doubles each time, and once it has tried for
+    # the timeout, it waits until the lock is released. The lock is released when the returned file is closed
+    @staticmethod
+    def __takeLock(lockFileName, exclusive):
+
+        lockFile = open(lockFileName, "a")
+        if (fcntl is None):
+            return lockFile
+
+        lockType = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        backoff = Table.lockBackoff
+        waited = 0
+        while True:
+            try:
+                fcntl.flock(lockFile.fileno(), lockType | fcntl.LOCK_NB)
+                return lockFile
+            except BlockingIOError:
+                pass
+
+            if (waited >= Table.lockTimeout):
+                print("The database is being used by another terminal, waiting for it to finish...")
+                fcntl.flock(lockFile.fileno(), lockType)
+                return lockFile
+
+            time.sleep(backoff)
+            waited += backoff
+            backoff = min(backoff * 2, Table.lockMaxBackoff)
+
+    # This method holds the read lock for a with statement, shared with the other terminals reading the files, or on its
+    # own whilst a new database is swapped in for the old one
+    @staticmethod
+    @contextlib.contextmanager
+    def __readLock(exclusive=False):
+
+        lockFile = Table.__takeLock(Table.readLockFile, exclusive)
+        try:
+            yield
+        finally:
+            lockFile.close()
+
+    # This method holds the read lock for a with statement whilst the files of the database are read other than into the
+    # cache, such as by a backup, so that another terminal can't swap in a new database (and remove the journal) between
+    # one file being read and the next
+    @staticmethod
+    @contextlib.contextmanager
+    def readingFiles():
+
+        with Table.__readLock():
+            yield
+
+    # This method holds the write lock, and the read lock on its own, for a with statement whilst the files of the
+    # database are replaced other than from the cache, such as by restoring a backup, so no other terminal reads or
+    # writes them in between. The cache no longer matches the files afterwards, so it is read from them again
+    @staticmethod
+    @contextlib.contextmanager
+    def replacingFiles():
+
+        Table.__acquireWriteLock()
+        try:
+            with Table.__readLock(True):
+                yield
+        finally:
+            Table.databaseCache["stamp"] = None
+            Table.__releaseWriteLock()
+
+    # This method holds the backup lock for a with statement, whilst a backup is made or restored. Only one terminal can
+    # hold it, so two backups can't be given the same number, and one can't remove the blocks another has written but
+    # not yet listed in its snapshot
+    @staticmethod
+    @contextlib.contextmanager
+    def backingUp():
+
+        os.makedirs(Table.backupFolder, exist_ok=True)
+        lockFile = Table.__takeLock(os.path.join(Table.backupFolder, "backup.lock"), True)
+        try:
+            yield
+        finally:
+            lockFile.close()
+
+    # This method takes the write lock, if this terminal doesn't already hold it. Once it is taken, the cache is brought
+    # up to date with the files, so that the changes are made to the latest version of the database, and the changes
+    # made by other terminals aren't lost
+    @staticmethod
+    def __acquireWriteLock():
+
+        if (Table.writeLockDepth == 0):
+            Table.writeLock = Table.__takeLock(Table.writeLockFile, True)
+            Table(0).__loadDatabase()
+
+        Table.writeLockDepth += 1
+
+    # This method releases the write lock, once every method that took it has finished
+    @staticmethod
+    def __releaseWriteLock():
+
+        Table.writeLockDepth -= 1
+        if (Table.writeLockDepth == 0):
+            Table.writeLock.close()
+            Table.writeLock = None
+
+    # This function is used as a decorator on the methods that change the database, so that they are run whilst this
+    # terminal holds the write lock
+    def __writes(method):
+
+        def lockedMethod(*args, **kwargs):
+            Table.__acquireWriteLock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                Table.__releaseWriteLock()
+
+        lockedMethod.__name__ = method.__name__
+        lockedMethod.__doc__ = method.__doc__
+        return lockedMethod
+
+    # This function is used as a decorator on the methods a terminal can ask the database server to run. Whilst this
+    # terminal is connected to the server, the method is sent to the server to run instead of being run here
+    def __served(method):
+
+        def servedMethod(*args, **kwargs):
+            if (Table.serverConnection is None):
+                return method(*args, **kwargs)
+
+            # A method of a table is run on the same table in the server
+            if (len(args) > 0 and isinstance(args[0], Table)):
+                return Table.__callServer(args[0].tableNum, method.__name__, args[1:], kwargs)
+
+            return Table.__callServer(None, method.__name__, args, kwargs)
+
+        servedMethod.__name__ = method.__name__
+        servedMethod.__doc__ = method.__doc__
+        servedMethod.served = True
+        return servedMethod
+
+    # This function is used as a decorator on the served methods that can be given a function to select records with. A
+    # function can't be sent to the database server, so a terminal using the server runs it on the records itself, and
+    # sends the positions of the records it selected. This is done in a transaction, which holds the write lock in the
+    # server, so the records can't be changed by another terminal in between
+    def __selects(method):
+
+        def selectingMethod(self, selection):
+            if (Table.serverConnection is None or callable(selection) == False):
+                return method(self, selection)
+
+            with Table.transaction():
+                return method(self, [index for index, record in enumerate(self.iterRecords()) if selection(record)])
+
+        selectingMethod.__name__ = method.__name__
+        selectingMethod.__doc__ = method.__doc__
+        selectingMethod.served = True
+        return selectingMethod
+
+    # This method connects this terminal to the database server, so that every served method is run by the server.
+    # It returns whether the connection was made
+    @staticmethod
+    def connectServer(address=None):
+
+        host, port = splitServerAddress(Table.serverAddress if address is None else address)
+        try:
+            if (port is None):
+                connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                connection.connect(host)
+            else:
+                connection = socket.create_connection((host, port))
+        except (OSError, AttributeError):
+            return False
+
+        Table.serverConnection = connection.makefile("rwb")
+        return True
+
+    # This method sends a method to the database server to run, and waits for its result. Anything the method printed
+    # in the server is printed here, and an error it raised is raised here
+    @staticmethod
+    def __callServer(tableNum, methodName, args, kwargs):
+
+        request = {"table": tableNum, "method": methodName, "args": Table.__encodeValue(list(args)),
+                   "kwargs": Table.__encodeValue(kwargs)}
+        try:
+            Table.serverConnection.write(json.dumps(request).encode("utf-8") + b"\n")
+            Table.serverConnection.flush()
+            response = Table.serverConnection.readline()
+        except OSError:
+            response = b""
+
+        # If the server has stopped, the terminal can't carry on
+        if (response == b""):
+            Table.serverConnection = None
+            raise ConnectionError("Lost the connection to the database server.")
+
+        response = json.loads(response)
+        print(response["output"], end="")
+        if ("error" in response):
+            raise RuntimeError(response["error"])
+
+        return Table.__decodeValue(response["result"])
+
+    # This method runs a method that a terminal asked the database server to run, and gives back the response to send
+    # to the terminal, which holds the method's result (or the error it raised) and anything it printed
+    @staticmethod
+    def serveRequest(request):
+
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                target = Table if request["table"] is None else Table(request["table"])
+                method = getattr(target, request["method"], None)
+
+                # Only the served methods can be run, so a terminal can't run any other part of the server
+                if (getattr(method, "served", False) == False):
+                    raise AttributeError(f"{request['method']} cannot be run by the database server.")
+
+                result = method(*Table.__decodeValue(request["args"]), **Table.__decodeValue(request["kwargs"]))
+
+                # Records that are given one at a time are all sent together
+                if (hasattr(result, "__next__")):
+                    result = list(result)
+
+            return {"output": output.getvalue(), "result": Table.__encodeValue(result)}
+        except Exception as error:
+            return {"output": output.getvalue(), "error": f"{type(error).__name__}: {error}"}
+
+    # This method converts a value into one that can be sent between the server and a terminal. A record is sent as its
+    # table and the text of its values, and a table is sent as its number
+    @staticmethod
+    def __encodeValue(value):
+
+        if (isinstance(value, TableRow)):
+            return {"~row": value.tableNum, "values": list(value)}
+
+        if (isinstance(value, Table)):
+            return {"~table": value.tableNum}
+
+        if (isinstance(value, dict)):
+            return {key: Table.__encodeValue(item) for key, item in value.items()}
+
+        if (isinstance(value, (list, tuple))):
+            return [Table.__encodeValue(item) for item in value]
+
+        return value
+
+    # This method converts a value that was sent between the server and a terminal back into the value it was made from
+    @staticmethod
+    def __decodeValue(value):
+
+        if (isinstance(value, dict)):
+            if ("~row" in value):
+                return Table(value["~row"]).__makeRow(value["values"])
+
+            if ("~table" in value):
+                return Table(value["~table"])
+
+            return {key: Table.__decodeValue(item) for key, item in value.items()}
+
+        if (isinstance(value, list)):
+            return [Table.__decodeValue(item) for item in value]
+
+        return value
+
+    # This method gets the version of the database, which changes whenever any terminal changes the database. A process
+    # that asks the user which record to change can get the version first, and check it is the same once the
+    # transaction has started, so it knows that the record the user chose is still at the same position
+    @staticmethod
+    @__served
+    def databaseVersion():
+        return Table(0).__loadDatabase()["stamp"]
+
+    # This method turns profiling on or off. Whilst a terminal uses the database server, the server's profiling is
+    # turned on or off instead, as the server runs the operations
+    @staticmethod
+    @__served
+    def setProfiling(enabled):
+
+        if (enabled and Table.profiling == False):
+            Table.resetProfile()
+        Table.profiling = enabled
+
+    # This method empties the profile, so that it starts again from now
+    @staticmethod
+    @__served
+    def resetProfile():
+
+        Table.profile = {"started": time.time(), "operations": {}, "bytesRead": 0, "bytesWritten": 0,
+                         "fileDecryptions": 0, "fileEncryptions": 0, "decryptedCharacters": 0,
+                         "encryptedCharacters": 0, "instances": 0}
+
+    # This method prints the profile: the counters, then each operation's calls, total, mean and longest time, and how
+    # many of its calls took under each bucket's time, slowest operations first
+    @staticmethod
+    @__served
+    def printProfile():
+
+        profile = Table.profile
+        print(f"Profiling is {'on' if Table.profiling else 'off'}, since {time.strftime('%d/%m/%y %H:%M:%S', time.localtime(profile['started']))}")
+        print(f"Tables made: {profile['instances']}")
+        print(f"Bytes read: {profile['bytesRead']}, bytes written: {profile['bytesWritten']}")
+        print(f"Whole files decrypted: {profile['fileDecryptions']}, whole files encrypted: {profile['fileEncryptions']}")
+        print(f"Characters decrypted: {profile['decryptedCharacters']}, characters encrypted: {profile['encryptedCharacters']}")
+
+        if (len(profile["operations"]) == 0):
+            return print("No Operations (0)")
+
+        bucketNames = [f"<{bucket}ms" for bucket in Table.profileBuckets] + [f">={Table.profileBuckets[-1]}ms"]
+        print(f"{'Operation':<24}{'Calls':>8}{'Total ms':>12}{'Mean ms':>10}{'Max ms':>10}" + "".join([f"{name:>10}" for name in bucketNames]))
+
+        for name, operation in sorted(profile["operations"].items(), key=lambda item: item[1]["total"], reverse=True):
+            print(f"{name:<24}{operation['calls']:>8}{operation['total'] * 1000:>12.2f}{operation['total'] * 1000 / operation['calls']:>10.3f}"
+                  f"{operation['max'] * 1000:>10.3f}" + "".join([f"{count:>10}" for count in operation["histogram"]]))
+
+    # This method times the statements of a with statement as an operation of the profile, whilst profiling is on. It
+    # is used by the front end, to time the part of each process that uses the database, without the time spent waiting
+    # for the user
+    @staticmethod
+    @contextlib.contextmanager
+    def measure(operationName):
+
+        if (Table.profiling == False):
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            Table.__recordTime(operationName, time.perf_counter() - start)
+
+    # This method makes the metrics of the profile in the Prometheus text format. Each operation's times are a histogram
+    # in seconds, labelled with the name of the operation, and each counter is a counter. The number of entries in the
+    # journal is given as a gauge, as the database gets slower to change as it grows
+    @staticmethod
+    def metricsText():
+
+        profile = Table.profile
+        lines = ["# HELP cafe_operation_duration_seconds Time taken by the operations of the database and the front end.",
+                 "# TYPE cafe_operation_duration_seconds histogram"]
+
+        # The operations are copied first, as the metrics may be made whilst operations are being recorded
+        for name, operation in sorted(dict(profile["operations"]).items()):
+            histogram = list(operation["histogram"])
+            cumulativeCount = 0
+            for bucket, count in zip(Table.profileBuckets, histogram):
+                cumulativeCount += count
+                lines.append(f'cafe_operation_duration_seconds_bucket{{operation="{name}",le="{bucket / 1000:g}"}} {cumulativeCount}')
+
+            lines.append(f'cafe_operation_duration_seconds_bucket{{operation="{name}",le="+Inf"}} {sum(histogram)}')
+            lines.append(f'cafe_operation_duration_seconds_sum{{operation="{name}"}} {operation["total"]}')
+            lines.append(f'cafe_operation_duration_seconds_count{{operation="{name}"}} {sum(histogram)}')
+
+        counters = [["bytes_read_total", "bytesRead", "Bytes read from the database files."],
+                    ["bytes_written_total", "bytesWritten", "Bytes written to the database files."],
+                    ["file_decryptions_total", "fileDecryptions", "Whole files or segments decrypted."],
+                    ["file_encryptions_total", "fileEncryptions", "Whole files or segments encrypted."],
+                    ["decrypted_characters_total", "decryptedCharacters", "Characters decrypted."],
+                    ["encrypted_characters_total", "encryptedCharacters", "Characters encrypted."],
+                    ["tables_made_total", "instances", "Tables made."]]
+        for metricName, counter, description in counters:
+            lines += [f"# HELP cafe_{metricName} {description}", f"# TYPE cafe_{metricName} counter",
+                      f"cafe_{metricName} {profile[counter]}"]
+
+        lines += ["# HELP cafe_journal_entries Entries in the journal that are not yet written into the database.",
+                  "# TYPE cafe_journal_entries gauge", f"cafe_journal_entries {Table.databaseCache['logEntries']}",
+                  "# HELP cafe_profile_start_time_seconds When the profile was started, as a Unix time.",
+                  "# TYPE cafe_profile_start_time_seconds gauge", f"cafe_profile_start_time_seconds {profile['started']}"]
+
+        return "\n".join(lines) + "\n"
+
+    # This method writes the metrics into the metrics file. It is written next to the file and renamed over it, so a
+    # collector never reads a half written file
+    @staticmethod
+    def writeMetrics():
+
+        Table.metricsWritten = time.time()
+        try:
+            with open(Table.metricsFile + ".tmp", "w") as file:
+                file.write(Table.metricsText())
+            os.replace(Table.metricsFile + ".tmp", Table.metricsFile)
+        except OSError:
+            print(f"Failed to write the metrics to {Table.metricsFile}.")
+
+    # This method starts a transaction. Every change made to any table until the transaction is committed is written to
+    # the journal together, in a single write, or none of them are if the transaction is rolled back. The write lock is
+    # held until the transaction ends. Transactions cannot be nested, so starting one whilst one is in progress does
+    # nothing. Whether a transaction was started is returned
+    @staticmethod
+    @__served
+    def beginTransaction():
+
+        if (Table.transactionEntries is not None):
+            return False
+
+        Table.__acquireWriteLock()
+        Table.transactionEntries = []
+        return True
+
+    # This method commits the transaction in progress, writing all of its changes to the journal at once
+    @staticmethod
+    @__served
+    @__profiled
+    def commitTransaction():
+
+        entries = Table.transactionEntries
+        if (entries is None):
+            return
+
+        Table.transactionEntries = None
+        try:
+            if (len(entries) > 0):
+                Table(0).__appendLog(entries)
+        finally:
+            Table.__releaseWriteLock()
+
+    # This method rolls back the transaction in progress. None of its changes were written, so the cache is read from
+    # the files again to undo them
+    @staticmethod
+    @__served
+    def rollbackTransaction():
+
+        if (Table.transactionEntries is not None):
+            Table.transactionEntries = None
+            Table.__releaseWriteLock()
+
+        Table.databaseCache["stamp"] = None
+
+    # This method makes a transaction for a with statement, which is committed at the end of the statement, or rolled
+    # back if an error stops the statement. Inside another transaction, the statement is part of that transaction, so it
+    # is committed when that one is
+    @staticmethod
+    @contextlib.contextmanager
+    def transaction():
+
+        started = Table.beginTransaction()
+        try:
+            yield
+        except BaseException:
+            Table.rollbackTransaction()
+            raise
+
+        if (started):
+            Table.commitTransaction()
+
+    # This method writes entries to the end of the journal, without rewriting the database. The journal is encrypted
+    # from its own start, and each new entry is encrypted from the position of the end of the journal, so the whole
+    # journal can still be decrypted in one go. The entries are made sure to be on the disk before the method returns
+    @__profiled
+    def __appendLog(self, entries):
+
+        # Whilst a transaction is in progress, the entries are kept until it is committed
+        if (Table.transactionEntries is not None):
+            Table.transactionEntries.extend(entries)
+            return
+
+        cache = Table.databaseCache
+
+        # If another terminal changed the database since the cache was read, the changes in the cache were made to an
+        # old version of the database, so they are not written, and the cache is read from the files again
+        if (cache["stamp"] != Table.__fileStamp()):
+            cache["stamp"] = None
+            return print("Failed to save, the database was changed by another terminal. Please try again.")
+
+        # If the journal would get too long, the entries (which are already in the cache) are written into the
+        # database straight away, rather than being appended and then written
+        if (cache["logEntries"] + len(entries) >= Table.logCompactionSize):
+            return self.__saveDatabase()
+
+        # Each entry is followed by its length
+        lines = [",".join(entry + [str(len(",".join(entry)))]) for entry in entries]
+
+        # The journal starts with the generation of the database it is applied to, and each entry starts on a new line
+        if (cache["cipherLength"] == 0):
+            lines.insert(0, f"#~G:{cache['generation']}")
+        journalPlain = ("\n" if cache["cipherLength"] > 0 else "") + "\n".join(lines)
+
+        # Write the entries onto the end of the journal, replacing a journal left from an older generation
+        with open(Table.journalFile, "ab" if cache["cipherLength"] > 0 else "wb") as file:
+            file.write(self.__encryption(journalPlain, cache["cipherLength"]).encode("ascii"))
+            Table.__count("bytesWritten", len(journalPlain))
+            file.flush()
+            os.fsync(file.fileno())
+
+        # A new journal's name has to be on the disk too, or it could be lost with the entries in it
+        if (cache["cipherLength"] == 0):
+            Table.syncDirectory(Table.journalFile)
+
+        cache["stamp"] = Table.__fileStamp()
+        cache["cipherLength"] += len(journalPlain)
+        cache["logEntries"] += len(entries)
+
+    # This method converts the database into another storage format, either "single" for the whole database in one file,
+    # or "segmented" for each table in its own segment of the segment file. The old file is removed once the new one
+    # has been written
+    @staticmethod
+    @__served
+    @__profiled
+    @__writes
+    def convertStorage(storageFormat):
+
+        table = Table(0)
+        cache = table.__loadDatabase()
+        if (storageFormat == cache["format"]):
+            return
+
+        # Every table is read, so that all of them can be written in the new format
+        for section in cache["sections"]:
+            table.__loadSection(section)
+
+        oldFile = Table.segmentFile if cache["format"] == "segmented" else Table.databaseFile
+        cache["format"] = storageFormat
+        table.__saveDatabase()
+        os.remove(oldFile)
+
+        cache["stamp"] = Table.__fileStamp()
+
+    # This method compacts the log and journal back into the tables by rewriting the whole database in the canonical
+    # layout, and then removing the journal
+    @__served
+    @__profiled
+    @__writes
+    def compactDatabase(self):
+
+        if (self.__loadDatabase()["logEntries"] > 0):
+            self.__saveDatabase()
+
+    # This method gets the cached section of the database that belongs to the table, or None if it has no identifier
+    # in the database yet. If create is true, a missing section is made at the end of the database
+    def __getSection(self, create=False):
+
+        cache = self.__loadDatabase()
+        for section in cache["sections"]:
+            if (section["tableNum"] == str(self.tableNum)):
+
+                # If another terminal has written a new segment file since the cache was read, the cache is read again
+                if (self.__loadSection(section) == False):
+                    cache["stamp"] = None
+                    return self.__getSection(create)
+
+                # If the table's sequence is missing, it is rebuilt from the highest ID in the table
+                if (section["sequence"] is None):
+                    section["sequence"] = self.__getHighestID(section) + 1
+
+                return section
+
+        if (create == False):
+            return None
+
+        section = {"identifier": self.tableIdentifier, "tableNum": str(self.tableNum), "sequence": 0, "records": [],
+                   "segment": None, "indexes": {}, "sortedKeys": {}, "sortedViews": {}}
+        cache["sections"].append(section)
+
+        return section
+
+    # This method gets the record class of the table, which is made from the table's fields the first time it is needed
+    def __rowClass(self):
+
+        if (self.tableNum not in Table.rowClasses):
+            Table.rowClasses[self.tableNum] = type(self.tableName.replace(" ", "") + "Row", (TableRow,), {
+                "__slots__": tuple(self.tableFields),
+                "tableNum": self.tableNum,
+                "fieldNames": tuple(self.tableFields),
+                "fieldTypes": self.schema.fieldTypes
+            })
+
+        return Table.rowClasses[self.tableNum]
+
+    # This method makes a record of the table's record class from a list of text. If the list has the wrong number of
+    # values for the table, it is kept as a list
+    def __makeRow(self, values):
+
+        if (isinstance(values, TableRow) or len(values) != len(self.tableFields)):
+            return values
+
+        return self.__rowClass()(values)
+
+    # This method gets a value from a record by the index of its field, in the type of the field if the record is in the
+    # table's record class, or as text if it is a list
+    def __fieldValue(self, record, fieldIndex):
+
+        if (isinstance(record, TableRow)):
+            return record.typedValue(fieldIndex)
+
+        return record[fieldIndex] if fieldIndex < len(record) else ""
+
+    # This method converts a value into the key it is stored under in an index, using the type of the field, so that
+    # searching for 5 or "5" finds the same record. Dates and times are converted to numbers so that they are in
+    # order in a sorted index. If the value cannot be converted, its text is used instead
+    def __indexKey(self, fieldIndex, value):
+
+        fieldType = self.schema.fields[fieldIndex].fieldType
+        additionalValidation = self.schema.fields[fieldIndex].validation
+
+        # Values from records are already in the type of their field
+        if (type(value) is fieldType and fieldType is not bool and fieldType is not str):
+            return value
+
+        try:
+            if (fieldType is bool):
+                return int(value)
+            if (fieldType is int or fieldType is float):
+                return fieldType(value)
+
+            # Dates are in the format of dd/mm/yy, so they are ordered by year, then month, then day
+            if (additionalValidation == ["format", "date"]):
+                day, month, year = str(value).split("/")
+                return (int(year), int(month), int(day))
+
+            # Times are in the format of HH:MM, so they are ordered by hour, then minute
+            if (additionalValidation == ["format", "time"]):
+                hour, minute = str(value).split(":")
+                return (int(hour), int(minute))
+        except (TypeError, ValueError):
+            pass
+
+        return str(value)
+
+    # This method makes the key used to order the keys of a sorted index. Keys that could not be converted are text,
+    # and are put after the converted keys so that they are never compared with each other
+    @staticmethod
+    def __orderKey(key):
+        return (type(key) is str, key)
+
+    # This method gets the fields of the table that have an index, and how they are declared, from the table's schema
+    def __indexedFields(self):
+        return self.schema.indexedFields
+
+    # This method makes a hash index for a field that wasn't declared with one, so that records can be found by that
+    # field without searching through the whole table
+    @__served
+    def createIndex(self, field):
+        self.__indexedFields().setdefault(self.schema.fieldIndexes[field], ["hash", "multiple"])
+
+    # This method gets the index of a field, which is a dictionary from each value in the field to the positions of
+    # the records holding that value. If the field doesn't have an index, None is returned
+    # The index is made the first time it is needed, and then kept up to date as records are created, amended and
+    # deleted, until the cache is read from the file again
+    def __getIndex(self, fieldIndex):
+
+        if (fieldIndex not in self.__indexedFields()):
+            return None
+
+        section = self.__getSection()
+
+        # If the table has no identifier in the database, it has no records
+        if (section is None):
+            return {}
+
+        if (fieldIndex not in section["indexes"]):
+            section["indexes"][fieldIndex] = {}
+
+            # A sorted index also keeps its keys in order
+            if (self.__indexedFields()[fieldIndex][0] == "sorted"):
+                section["sortedKeys"][fieldIndex] = []
+
+            for position, record in enumerate(section["records"]):
+                self.__addToIndex(section, fieldIndex, record, position)
+
+        return section["indexes"][fieldIndex]
+
+    # This method adds the position of a record to an index under the record's value in the field
+    def __addToIndex(self, section, fieldIndex, record, position):
+
+        if (fieldIndex >= len(record)):
+            return
+
+        index = section["indexes"][fieldIndex]
+        key = self.__indexKey(fieldIndex, self.__fieldValue(record, fieldIndex))
+
+        # If it is the first record with this value, the key is added to the sorted keys of a sorted index
+        if (key not in index):
+            index[key] = []
+            if (fieldIndex in section["sortedKeys"]):
+                bisect.insort(section["sortedKeys"][fieldIndex], Table.__orderKey(key))
+
+        bisect.insort(index[key], position)
+
+    # This method removes the position of a record from an index
+    def __removeFromIndex(self, section, fieldIndex, record, position):
+
+        if (fieldIndex >= len(record)):
+            return
+
+        index = section["indexes"][fieldIndex]
+        key = self.__indexKey(fieldIndex, self.__fieldValue(record, fieldIndex))
+        index[key].remove(position)
+
+        # If it was the last record with this value, the key is removed from the index
+        if (len(index[key]) == 0):
+            del index[key]
+            if (fieldIndex in section["sortedKeys"]):
+                sortedKeys = section["sortedKeys"][fieldIndex]
+                del sortedKeys[bisect.bisect_left(sortedKeys, Table.__orderKey(key))]
+
+    # This method checks that a record does not have the same value as another record in a field with a unique index.
+    # The position is where the record is, or will be, in the table. If there is a clash, the field's name is returned
+    def __uniqueClash(self, record, position):
+
+        for fieldIndex, indexDeclaration in self.__indexedFields().items():
+            if (indexDeclaration[1] == "unique" and fieldIndex < len(record)):
+                positions = self.__getIndex(fieldIndex).get(self.__indexKey(fieldIndex, self.__fieldValue(record, fieldIndex)), [])
+
+                if (len([found for found in positions if found != position]) > 0):
+                    return self.tableFields[fieldIndex]
+
+        return None
+
+    # This method adds a record to the end of the table's section, and adds its position to the table's indexes
+    def __insertRecord(self, record):
+
+        record = self.__makeRow(record)
+        section = self.__getSection(True)
+        section["records"].append(record)
+
+        # The table's sequence moves past the record's ID, so that the ID is never given to another record
+        try:
+            section["sequence"] = max(section["sequence"], int(self.__fieldValue(record, 0)) + 1)
+        except (TypeError, ValueError):
+            pass
+
+        # The table has changed, so its sorted views are out of date
+        section["sortedViews"] = {}
+
+        for fieldIndex in section["indexes"]:
+            self.__addToIndex(section, fieldIndex, record, len(section["records"])-1)
+
+    # This method removes the record at a position from the table's section. As every record after it moves up by one,
+    # their positions in the table's indexes are moved up as well
+    def __removeRecord(self, position):
+
+        section = self.__getSection()
+        record = section["records"].pop(position)
+        section["sortedViews"] = {}
+
+        for fieldIndex, index in section["indexes"].items():
+            self.__removeFromIndex(section, fieldIndex, record, position)
+
+            for positions in index.values():
+                for counter in range(len(positions)):
+                    if (positions[counter] > position):
+                        positions[counter] -= 1
+
+    # This method takes the record at a position out of the table's indexes, without removing it from the table, so the
+    # positions of the records after it don't change. It is removed from the table with __removeRecords afterwards
+    def __hideRecord(self, position):
+
+        section = self.__getSection()
+        section["sortedViews"] = {}
+
+        for fieldIndex in section["indexes"]:
+            self.__removeFromIndex(section, fieldIndex, section["records"][position], position)
+
+    # This method removes the records at a set of positions from the table's section in a single pass. As most positions
+    # change, the table's indexes are made again the next time they are needed, rather than being moved one at a time
+    def __removeRecords(self, positions):
+
+        section = self.__getSection()
+        section["records"] = [record for position, record in enumerate(section["records"]) if position not in positions]
+        section["indexes"] = {}
+        section["sortedKeys"] = {}
+        section["sortedViews"] = {}
+
+    # This method replaces the record at a position in the table's section, moving its position in the table's indexes
+    # to the keys of its new values
+    def __replaceRecord(self, position, record):
+
+        record = self.__makeRow(record)
+        section = self.__getSection()
+        oldRecord = section["records"][position]
+        section["records"][position] = record
+        section["sortedViews"] = {}
+
+        # If the record's ID was amended, the table's sequence moves past the new ID too, so it is never given to another
+        # record
+        try:
+            section["sequence"] = max(section["sequence"], int(self.__fieldValue(record, 0)) + 1)
+        except (TypeError, ValueError):
+            pass
+
+        for fieldIndex in section["indexes"]:
+            self.__removeFromIndex(section, fieldIndex, oldRecord, position)
+            self.__addToIndex(section, fieldIndex, record, position)
 
     # This method reads the records concerning its own table and converts it to a list for manipulation in other methods
     # This method is private as indicated by the two underscores
     def __tableToList(self):
 
-        # Open the database in readonly format
-        with open("db.txt", "r") as file:
+        section = self.__getSection()
 
-            # Decrypts the database and converts it into a list of records
-            file = [self.__decryption(file.read())][0].split("\n")
+        # If the table has no identifier in the database, it has no records
+        if (section is None):
+            return []
 
-            # If the file is empty, make the file list empty
-            file = [] if file == [""] else file
+        # Results in a decrypted list ready for usage elsewhere. The records themselves cannot be changed, so only the
+        # list is copied to stop changes made to it elsewhere from altering the cache
+        return list(section["records"])
 
-            # List to store the records
-            recordsList = []
+    # This method gets the table's list of records in the cache itself, without copying it, for methods that look up
+    # many records by their positions. The cache is checked against the files once, rather than for every record
+    def __sectionRecords(self):
 
-            # Linearly searches from the first line and ignores the data until it recognises its own unique identifier
-            tableFlag = False
-            for databaseLine in file:
-                if (tableFlag):
-                    if ("#~" in databaseLine):
-                        break
-                    else:
-                        # A single record which is decrypted
-                        record = databaseLine.split(",")
+        section = self.__getSection()
+
+        # If the table has no identifier in the database, it has no records
+        if (section is None):
+            return []
+
+        return section["records"]
+
+    # This method goes through the records of the table one at a time, rather than making a list of all of them.
+    # filters is a dictionary of field names and values that a record must have to be given, and fields is a list of the
+    # field names to give from each record (as a list of their text), rather than the whole record.
+    # If the cache is up to date, the records come from it (using an index for a filter if there is one). Otherwise, the
+    # file is decrypted a chunk at a time, and the records are given as soon as they are read, so a loop over them can
+    # stop early without reading the rest of the file. A terminal using the database server is given them all at once
+    @__served
+    def iterRecords(self, filters=None, fields=None):
+
+        fieldIndexes = None if fields is None else [self.schema.fieldIndexes[field] for field in fields]
+
+        for position, record in self.__filteredRecords(filters):
+            yield record if fieldIndexes is None else [record[fieldIndex] for fieldIndex in fieldIndexes]
+
+    # This method gives the records that match the filters, along with their positions in the table. If a sort field
+    # is given, the records are given in order of that field, which needs the whole table to be read into the cache
+    def __filteredRecords(self, filters, sortField=None):
+
+        # Converts the filters into the field indexes and the keys that the records' values are compared with
+        filterKeys = []
+        for field, value in ({} if filters is None else filters).items():
+            fieldIndex = self.schema.fieldIndexes[field]
+            filterKeys.append([fieldIndex, self.__indexKey(fieldIndex, value)])
 
-                        # Adds decrypted record to list
-                        recordsList.append(record)
+        if (sortField is None):
+            records = self.__recordStream(filterKeys)
+        else:
+            positions = self.__sortedView(self.schema.fieldIndexes[sortField])[0]
+            sectionRecords = self.__sectionRecords()
+            records = ((position, sectionRecords[position]) for position in positions)
+
+        for position, record in records:
+
+            # Skips the record if any of its values don't match the filters
+            matched = True
+            for fieldIndex, key in filterKeys:
+                if (self.__indexKey(fieldIndex, self.__fieldValue(record, fieldIndex)) != key):
+                    matched = False
+                    break
+
+            if (matched):
+                yield position, record
+
+    # This method gives the records (and their positions in the table) that the iterRecords method filters, from the
+    # cache if it is up to date, otherwise from the file
+    def __recordStream(self, filterKeys):
+
+        cache = Table.databaseCache
+
+        # If the cache is out of date (and the database isn't segmented, where the directory is quick to read), the
+        # records are read straight from the file, followed by the records created in the journal. Deletions and
+        # amendments in the journal change records that would already have been given, so if the table has any, the
+        # table is read into the cache instead
+        if ((cache["stamp"] is None or cache["stamp"] != Table.__fileStamp()) and Table.storageFormat() == "single"):
+            entries = [entry for entry in self.__readJournal()[2]
+                       if Table.__validLogEntry(entry) and entry[1] == str(self.tableNum)]
+
+            if (all([entry[0] == "C" for entry in entries])):
+                yield from enumerate(self.__withCreatedRecords(self.__streamDatabaseFile(), entries))
+                return
+
+        cache = self.__loadDatabase()
+        section = None
+        for tableSection in cache["sections"]:
+            if (tableSection["tableNum"] == str(self.tableNum)):
+                section = tableSection
+
+        if (section is None):
+            return
+
+        # A segmented table that hasn't been read yet is read from its segment a chunk at a time, followed by the
+        # records created in the log and journal, unless it has deletions or amendments
+        if (section["records"] is None):
+            entries = [entry for entry in cache["pendingLog"].get(str(self.tableNum), []) if Table.__validLogEntry(entry)]
+
+            if (all([entry[0] == "C" for entry in entries])):
+                yield from enumerate(self.__withCreatedRecords(self.__streamSegment(section), entries))
+                return
+
+            section = self.__getSection()
+
+        # If a filter is on a field with an index, only the records in the index under the filter's key are given
+        for fieldIndex, key in filterKeys:
+            index = self.__getIndex(fieldIndex)
+            if (index is not None):
+                for position in list(index.get(key, [])):
+                    yield position, section["records"][position]
+                return
+
+        # The list is copied so that records can be changed in a loop over them
+        yield from enumerate(list(section["records"]))
+
+    # This method gives the records read from the file, followed by the records of the "C" entries of the journal. A
+    # created record that was already read from the file isn't given again, as the database was written with it
+    def __withCreatedRecords(self, records, entries):
+
+        createdKeys = set([entry[2] for entry in entries])
+        for record in records:
+            if (len(createdKeys) > 0):
+                createdKeys.discard(record[0])
+
+            yield record
+
+        for entry in entries:
+            if (entry[2] in createdKeys):
+                createdKeys.discard(entry[2])
+                yield self.__makeRow(entry[2:-1])
+
+    # This method decrypts a cipher text a chunk at a time and gives each complete line as soon as it is decrypted.
+    # chunks is an iterable of pieces of the cipher text, which are decrypted from where they are in the text
+    def __streamLines(self, chunks):
 
-                if (self.tableIdentifier in databaseLine):
-                    tableFlag = True
+        keyOffset = 0
+        remainder = ""
+        for cipher in chunks:
+            Table.__count("bytesRead", len(cipher))
+            lines = (remainder + self.__decryption(cipher, keyOffset)).split("\n")
+            keyOffset += len(cipher)
 
-        # Results in a decrypted list ready for usage elsewhere
-        return recordsList
+            # The last line may carry on into the next chunk
+            remainder = lines.pop()
+            yield from lines
 
-    # This method prints out the table onto the console
+        if (keyOffset > 0):
+            yield remainder
+
+    # This method reads the records of the table straight from the database file, a chunk at a time, giving them in the
+    # same order as the cache has them: the records under the table's identifier, then the records created in the log
+    def __streamDatabaseFile(self):
+
+        # The chunks are a whole number of key lengths long
+        chunkSize = len(Table.key) * 4096
+
+        with open(Table.databaseFile, "r") as file:
+            tableFlag = False
+            tableRead = False
+            logFlag = False
+
+            for databaseLine in self.__streamLines(iter(lambda: file.read(chunkSize), "")):
+                if ("#~" in databaseLine):
+                    # Only the first section with the table's identifier is read, like the cache does
+                    tableNum = Table.__splitIdentifier(databaseLine)[1]
+                    tableFlag = (tableNum == str(self.tableNum) and tableRead == False)
+                    tableRead = tableRead or tableFlag
+                    logFlag = (tableNum == "L")
+
+                elif (tableFlag):
+                    yield self.__makeRow(databaseLine.split(","))
+
+                elif (logFlag):
+                    entry = databaseLine.split(",")
+                    if (Table.__validLogEntry(entry) and entry[0] == "C" and entry[1] == str(self.tableNum)):
+                        yield self.__makeRow(entry[2:-1])
+
+    # This method reads the records of a table from its segment of the segment file, a chunk at a time
+    def __streamSegment(self, section):
+
+        if (section["segment"] is None):
+            return
+
+        start, length = section["segment"]
+        chunkSize = len(Table.key) * 4096
+
+        # If another terminal has written a new segment file since the cache was read, the records are read from the
+        # cache once it has been read again
+        file = Table.__openSegmentFile()
+        if (file is None):
+            Table.databaseCache["stamp"] = None
+            yield from (record for position, record in self.__recordStream([]))
+            return
+
+        with file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mappedFile:
+                chunks = (mappedFile[offset:min(offset + chunkSize, start + length)].decode("ascii")
+                          for offset in range(start, start + length, chunkSize))
+
+                # The first line of a table's segment is its identifier
+                lines = self.__streamLines(chunks)
+                next(lines, None)
+
+                for databaseLine in lines:
+                    yield self.__makeRow(databaseLine.split(","))
+
+    # This method prints out a single page of the table onto the console, with the position of each record in the
+    # table so that it can be selected. Only the records up to the end of the page are read (unless the page is sorted),
+    # and whether there is another page after it is returned.
+    # sortField is the field the records are ordered by, filters is a dictionary of field names and values that the
+    # records must have, and fields is a list of the field names to show
+    @__served
+    @__profiled
+    def listPage(self, page=0, pageSize=None, sortField=None, filters=None, fields=None):
+
+        pageSize = Table.pageSize if pageSize is None else pageSize
+        fieldIndexes = list(range(len(self.tableFields))) if fields is None else [self.schema.fieldIndexes[field] for field in fields]
+
+        # Takes the records on the page and the first record of the next page, to know if there is another page
+        records = self.__filteredRecords(filters, sortField)
+        pageRecords = list(itertools.islice(records, page * pageSize, (page + 1) * pageSize + 1))
+        records.close()
+
+        nextPage = len(pageRecords) > pageSize
+        pageRecords = pageRecords[:pageSize]
+
+        # Prints fields
+        print("Index " + " ".join([self.tableFields[fieldIndex] for fieldIndex in fieldIndexes]))
+
+        # Prints each decrypted record after its position
+        for position, record in pageRecords:
+            print(f"({position}) " + " ".join([record[fieldIndex] for fieldIndex in fieldIndexes]))
+
+        # If there are no records on the page, print that there are none
+        if (len(pageRecords) == 0):
+            print("No Records (0)")
+        else:
+            print(f"Page {page + 1}: records {page * pageSize + 1} to {page * pageSize + len(pageRecords)}" + (", more on the next page" if nextPage else ""))
+
+        return nextPage
+
+    # This method prints out the table onto the console, printing each record as soon as it is read
+    @__served
+    @__profiled
     def listToViewable(self):
 
-        # Get decrypted list of records
-        recordsList = self.__tableToList()
+        # Prints fields
+        print(" ".join(self.tableFields))
 
-        # Starts at -1 to put in the fields first
-        for record in range(-1, len(recordsList)):
-            if (record == -1):
-                # Prints fields
-                print(" ".join(self.tableFields))
+        # Prints each decrypted record
+        recordCount = 0
+        for record in self.iterRecords():
+            print(" ".join(record))
+            recordCount += 1
 
-                # If there are no records in the table, print that there are none
-                if (len(recordsList) == 0):
-                    print("No Records (0)")
-            else:
-                # Prints the decrypted record
-                print(" ".join(recordsList[record]))
+        # If there are no records in the table, print that there are none
+        if (recordCount == 0):
+            print("No Records (0)")
 
     # This method gets the number of records in a table
+    @__served
+    @__profiled
     def tableLength(self):
 
-        # Get decrypted list of records
-        records = self.__tableToList()
+        # Get the table's section of the database, which has no records if it doesn't exist
+        section = self.__getSection()
 
         # Return the length of the list
-        return len(records)
+        return 0 if section is None else len(section["records"])
 
-    # Private method that gets to the highest primary key ID in a table
-    def __getHighestID(self):
+    # Private method that gets to the highest primary key ID in a table's section, by looking through every record.
+    # It is only used to rebuild the table's sequence, as new IDs are taken from the sequence
+    def __getHighestID(self, section):
 
-        # Get decrypted list of records
-        records = self.__tableToList()
         # Iterates through the table and compares until it gets the highest ID
         highestID = -1
-        for record in records:
-            if (int(record[0]) > highestID):
-                highestID = int(record[0])
+        for record in section["records"]:
+            if (int(self.__fieldValue(record, 0)) > highestID):
+                highestID = int(self.__fieldValue(record, 0))
 
         return highestID
 
-    # Creates a record
+    # This method gets the ID the next record created in the table is given. The IDs are taken from the table's sequence,
+    # which is kept with the table identifier in the database and only ever goes up, so the ID of a deleted record is
+    # never given to a new one
+    def __nextID(self):
+
+        section = self.__getSection()
+        return 0 if section is None else section["sequence"]
+
+    # This method rebuilds the sequence of every table from the highest ID in the table, and writes them into the
+    # database. It repairs the sequences if they are missing or have been edited to be lower than an ID in use
+    @staticmethod
+    @__served
+    @__profiled
+    @__writes
+    def repairSequences():
+
+        table = Table(0)
+        cache = table.__loadDatabase()
+        for section in cache["sections"]:
+            table.__loadSection(section)
+            if (section["tableNum"].isdigit() and int(section["tableNum"]) in Table.enumOfTableData):
+                section["sequence"] = Table(int(section["tableNum"])).__getHighestID(section) + 1
+
+        table.__saveDatabase()
+
+    # Creates a record, and returns its ID
+    @__served
+    @__profiled
+    @__writes
     def createRecord(self, fields):
 
         # If the number of attributes given are not equal to the fields, it is invalid
         if (len(fields) != len(self.tableFields)-1):
             return print("Invalid number of fields.")
 
-        # Gets the highest ID in the table
-        ID = str(self.__getHighestID()+1 if self.__getHighestID() != -1 else 0)
+        # Gets the next ID in the table's sequence
+        ID = str(self.__nextID())
 
         # Makes the record
-        createdRecord = f"{ID}," + ",".join(fields)
-
-        # Opens the database
-        with open("db.txt", "r") as file:
-            decryptedDatabase = self.__decryption(file.read())
-            databaseRecords = decryptedDatabase.split("\n")
-
-        # If the file is empty, make the file list empty
-        databaseRecords = [] if databaseRecords == [""] else databaseRecords
-
-        # This is used to find if the table has an identifier in the database
-        checkForIdentifier = True
-
-        # Used to store every record in the database
-        databaseRecordsList = []
-
-        # This simply finds the table's unique identifier and inserts the record below it (linear search)
-        for line in databaseRecords:
-            databaseRecordsList.append(line)
-            if (self.tableIdentifier in line):
-                databaseRecordsList.append(createdRecord)
-                checkForIdentifier = False
-
-        # If an identifier wasn't found, make one at the end of the file and add the record
-        if (checkForIdentifier):
-            databaseRecordsList.append(self.tableIdentifier)
-            databaseRecordsList.append(createdRecord)
-
-        # Converts the list into a string with newlines
-        databaseRecordsPlain = "\n".join(databaseRecordsList)
-
-        # Write the whole list into the database
-        with open("db.txt", "w") as file:
-            file.write(self.__encryption(databaseRecordsPlain))
+        createdRecord = [ID] + list(fields)
+
+        # If a field with a unique index already has this value, the record cannot be created
+        clashingField = self.__uniqueClash(createdRecord, self.tableLength())
+        if (clashingField is not None):
+            return print(f"Failed to create, a record with that {clashingField} already exists.")
+
+        # The record is added to the end of the table's section, making one at the end of the database if an
+        # identifier wasn't found
+        self.__insertRecord(createdRecord)
+
+        # Rather than rewriting the whole database, the record is written onto the end of the file as a log entry
+        self.__appendLog([["C", str(self.tableNum)] + createdRecord])
+
+        return ID
+
+    # Creates many records at once, from a list of the fields of each record. Every record is validated first, and if any
+    # of them are invalid, none of them are created. Otherwise, they are given IDs following on from the highest ID in
+    # the table and written to the database together. The IDs of the created records are returned
+    @__served
+    @__profiled
+    @__writes
+    def createRecords(self, recordsFields):
+
+        recordsFields, errors = self.__checkRecords(recordsFields)
+
+        if (len(errors) > 0):
+            for recordNum, error in errors:
+                print(f"Record {recordNum}: {error}")
 
-    # This method deletes a record in the table by using its index
+            return print("Failed to create records, no records were created.")
+
+        # The IDs follow on from the table's sequence
+        firstID = self.__nextID()
+        createdRecords = [[str(firstID + recordNum)] + fields for recordNum, fields in enumerate(recordsFields)]
+
+        # Adds every record to the table, then writes them to the database in a single write
+        for record in createdRecords:
+            self.__insertRecord(record)
+
+        self.__appendLog([["C", str(self.tableNum)] + record for record in createdRecords])
+
+        return [record[0] for record in createdRecords]
+
+    # This method validates the fields of a record (without its ID) as if it was being created, and returns every
+    # problem with it, or an empty list if it is valid
+    @__served
+    @__profiled
+    def validateRecord(self, fields):
+        return [error for recordNum, error in self.__checkRecords([fields])[1]]
+
+    # This method validates many records at once, from a list of the fields of each record, without creating any of
+    # them. Rather than stopping at the first invalid value, it returns every problem with every record, as a list of
+    # the record's position in the list and the problem, so a whole import can be fixed at once
+    @__served
+    @__profiled
+    def validateRecords(self, recordsFields):
+        return self.__checkRecords(recordsFields)[1]
+
+    # This method checks the fields of records that are about to be created with the checks of each field. It returns
+    # the records with their empty values filled in, and a list of every problem found, as each record's position and
+    # the problem. A value is only checked until it fails one check, but every value of every record is checked
+    def __checkRecords(self, recordsFields):
+
+        # The records are stored as text, so values from a script (such as numbers) are checked and stored as text too
+        fieldsData = self.schema.fields[1:]
+        recordsFields = [[str(value) for value in fields] for fields in recordsFields]
+        errors = []
+
+        # Each foreign key is looked up in the primary key index of the table it refers to, which is got once for the
+        # whole batch rather than for every value
+        keyChecks = [self.__keyCheck(field) if field.keyType == "F" else None for field in fieldsData]
+
+        for recordNum, fields in enumerate(recordsFields):
+
+            # If the number of attributes given are not equal to the fields, it is invalid
+            if (len(fields) != len(fieldsData)):
+                errors.append([recordNum, "Invalid number of fields."])
+                continue
+
+            for fieldNum, field in enumerate(fieldsData):
+
+                # If the value is empty, use the default value, or "None" if the field is not required
+                if (fields[fieldNum] == "" and field.emptyValue is not None):
+                    fields[fieldNum] = field.emptyValue
+                    continue
+
+                # A valid value is stored as it would be if the user had entered it (so "007" becomes "7")
+                failedCheck = field.validate(fields[fieldNum], keyChecks[fieldNum])
+                if (failedCheck is not None):
+                    errors.append([recordNum, f"Invalid {failedCheck} in {field.name}."])
+                else:
+                    fields[fieldNum] = field.normalise(fields[fieldNum])
+
+        # Checks that no record has the same value in a field with a unique index as another record, whether it is
+        # already in the table or is one of the other records being checked. The records' IDs are the ones they would
+        # be given from the table's sequence, which is checked too, in case a record already has one of them
+        firstID = self.__nextID()
+        for fieldIndex, indexDeclaration in self.__indexedFields().items():
+            if (indexDeclaration[1] == "unique"):
+                index = self.__getIndex(fieldIndex)
+                keys = set()
+
+                for recordNum, fields in enumerate(recordsFields):
+                    if (fieldIndex > len(fields)):
+                        continue
+
+                    value = str(firstID + recordNum) if fieldIndex == 0 else fields[fieldIndex-1]
+                    key = self.__indexKey(fieldIndex, value)
+                    if (key in index or key in keys):
+                        errors.append([recordNum, f"A record with that {self.tableFields[fieldIndex]} already exists."])
+                    keys.add(key)
+
+        # The problems with each record are kept together, in the order of the records
+        errors.sort(key=lambda error: error[0])
+
+        return recordsFields, errors
+
+    # This method makes the function that checks a value of a foreign key exists as a primary key, by looking it up in
+    # the primary key index of the table the foreign key refers to
+    def __keyCheck(self, field):
+
+        if (field.referencedTable is None):
+            return lambda value: False
+
+        checkTable = Table.primaryKeyTable(field.name)
+        index = checkTable.__getIndex(0)
+
+        return lambda value: checkTable.__indexKey(0, value) in index
+
+    # This method deletes a record in the table by using its index, and returns the deleted record's ID
+    @__served
+    @__profiled
+    @__writes
     def deleteRecord(self, index):
 
         # If index is greater than the table size or its negative, raise error
-        if (index > len(self.__tableToList())-1 or index < 0):
+        if (index > self.tableLength()-1 or index < 0):
             return print("Failed to delete, index out of bounds. Index likely bigger than list size.")
 
-        # This searches through the whole database
-        databaseRecordsList = []
-        with open("db.txt", "r") as file:
-            file = self.__decryption(file.read()).split("\n")
+        # The record with the specified index is removed from the table's section
+        primaryKey = self.__getRecordByIndex(index)[0]
+        self.__removeRecord(index)
 
-        # If the file is empty, make the file list empty
-        file = [] if file == [""] else file
-
-        # The counter is used to find the start of the table in the database (linear search)
-        indexCounter = 0
-        for preTable in file:
-                databaseRecordsList.append(preTable)
-                indexCounter += 1
-
-                # If the line contains the table identifier i.e the start of the table, then break
-                if (self.tableIdentifier in preTable):
-                    break
-
-        # The counter is used to find the index of the records (linear search)
-        counter = 0
-        for tableLine in file[indexCounter:]:
-            # If the record with the specified index is found, it is not added to the new database, effectively removing it
-            if (counter != index):
-                databaseRecordsList.append(tableLine)
-            counter += 1
-
-        # Converts the list into a string with newlines
-        databaseRecordsPlain = "\n".join(databaseRecordsList)
+        # Rather than rewriting the whole database, the deletion is written onto the end of the journal
+        self.__appendLog([["D", str(self.tableNum), primaryKey]])
 
-        # Write the whole list into the database
-        with open("db.txt", "w") as file:
-            file.write(self.__encryption(databaseRecordsPlain))
+        return primaryKey
 
-    # This method amends a record
+    # This method amends a record, and returns the amended record's ID
+    @__served
+    @__profiled
+    @__writes
     def amendRecord(self, index, field, value):
 
         # If index is greater than the table size or its negative, raise error
-        if (index > len(self.__tableToList())-1 or index < 0):
+        if (index > self.tableLength()-1 or index < 0):
             return print("Failed to delete, index out of bounds. Index likely bigger than list size.")
 
         # Gets the relevant information by the user input
-        amendedRecord = self.__getRecordByIndex(index)
-        fieldIndex = self.tableFields.index(field)
+        amendedRecord = list(self.__getRecordByIndex(index))
+        fieldIndex = self.schema.fieldIndexes[field]
         amendedRecord[fieldIndex] = value
 
-        # Formats record
-        amendedRecord = [field for field in amendedRecord]
-        amendedRecord = ",".join(amendedRecord)
-
-        # This does a mix of both the createRecord and deleteRecord methods, it deletes the old record
-        # and replaces it with the new one by finding its index
-        # This searches through the whole database
-        databaseRecordsList = []
-        with open("db.txt", "r") as file:
-            file = self.__decryption(file.read()).split("\n")
-
-        # If the file is empty, make the file list empty
-        file = [] if file == [""] else file
-
-        # The counter is used to find the start of the table in the database (linear search)
-        indexCounter = 0
-        for preTable in file:
-            databaseRecordsList.append(preTable)
-            indexCounter += 1
-
-            # If the line contains the table identifier i.e the start of the table, then break
-            if (self.tableIdentifier in preTable):
-                break
-
-        # The counter is used to find the index of the records (linear search)
-        counter = 0
-        for tableLine in file[indexCounter:]:
-            # If the record with the specified index is found, it is not added to the new database, and instead the new record is added
-            if (counter != index):
-                databaseRecordsList.append(tableLine)
-            else:
-                databaseRecordsList.append(amendedRecord)
-            counter += 1
-
-        # Converts the list into a string with newlines
-        databaseRecordsPlain = "\n".join(databaseRecordsList)
-
-        # Write the whole list into the database
-        with open("db.txt", "w") as file:
-            file.write(self.__encryption(databaseRecordsPlain))
+        # If a field with a unique index already has this value in another record, the record cannot be amended
+        clashingField = self.__uniqueClash(amendedRecord, index)
+        if (clashingField is not None):
+            return print(f"Failed to amend, a record with that {clashingField} already exists.")
+
+        # The old record is replaced with the new one by its index
+        primaryKey = self.__getRecordByIndex(index)[0]
+        self.__replaceRecord(index, amendedRecord)
+
+        # Rather than rewriting the whole database, the amended record is written onto the end of the journal
+        self.__appendLog([["A", str(self.tableNum), primaryKey] + amendedRecord])
+
+        return amendedRecord[0]
+
+    # This method deletes many records in the table at once, and writes them to the journal together. The records to delete
+    # are either given as a list of their indexes, or as a function that is given each record and returns true if it
+    # should be deleted. The number of deleted records is returned
+    @__selects
+    @__served
+    @__profiled
+    @__writes
+    def deleteRecords(self, selection):
+
+        # The records are got from the cache once, rather than for every index
+        records = self.__sectionRecords()
+
+        # Finds the indexes of the records the function selects
+        if (callable(selection)):
+            selection = [index for index, record in enumerate(records) if selection(record)]
+
+        # If any index is greater than the table size or its negative, raise error
+        for index in selection:
+            if (index > len(records)-1 or index < 0):
+                return print("Failed to delete, index out of bounds. Index likely bigger than list size.")
+
+        # If there are no records to delete, the database doesn't need to be written
+        if (len(selection) == 0):
+            return 0
+
+        # The records are removed in a single pass over the table
+        entries = [["D", str(self.tableNum), records[index][0]] for index in sorted(set(selection))]
+        self.__removeRecords(set(selection))
+
+        # Every deletion is written onto the end of the journal together
+        self.__appendLog(entries)
+
+        return len(set(selection))
+
+    # This method amends many records in the table at once, and writes them to the journal together. The updates are a
+    # list of [index, field, value], which are applied in order. If any update is invalid, none of them are made
+    @__served
+    @__profiled
+    @__writes
+    def amendRecords(self, updates):
+
+        # The records are got from the cache once, rather than for every update. Replacing a record changes this list
+        # itself, so it stays up to date
+        records = self.__sectionRecords()
+
+        # If any index is greater than the table size or its negative, raise error
+        for index, field, value in updates:
+            if (index > len(records)-1 or index < 0):
+                return print("Failed to amend, index out of bounds. Index likely bigger than list size.")
+
+        entries = []
+        oldRecords = []
+        for index, field, value in updates:
+
+            # Gets the relevant information by the update
+            oldRecord = records[index]
+            amendedRecord = list(oldRecord)
+            primaryKey = amendedRecord[0]
+            amendedRecord[self.schema.fieldIndexes[field]] = value
+
+            # If a field with a unique index already has this value in another record, the records cannot be amended.
+            # Only the updates this method has already made to the cache are undone, in reverse order, so that the rest
+            # of a transaction in progress is kept
+            clashingField = self.__uniqueClash(amendedRecord, index)
+            if (clashingField is not None):
+                for oldIndex, record in reversed(oldRecords):
+                    self.__replaceRecord(oldIndex, record)
+
+                return print(f"Failed to amend, a record with that {clashingField} already exists.")
+
+            # The old record is replaced with the new one by its index
+            self.__replaceRecord(index, amendedRecord)
+            oldRecords.append([index, oldRecord])
+            entries.append(["A", str(self.tableNum), primaryKey] + amendedRecord)
+
+        # Every amendment is written onto the end of the journal together
+        if (len(entries) > 0):
+            self.__appendLog(entries)
 
     # This method checks to see if a record exists based on a searchValue
+    @__served
+    @__profiled
     def verifyRecordExistence(self, searchValue, index=0):
 
-        # Get decrypted list of records
-        records = self.__tableToList()
+        # If the field has an index, the value can be looked up in it directly
+        valueIndex = self.__getIndex(index)
+        if (valueIndex is not None):
+            return self.__indexKey(index, searchValue) in valueIndex
 
-        # Linearly search through the records and if found, return true
-        for record in records:
+        # Linearly search through the records as they are read and if found, return true without reading the rest
+        for record in self.iterRecords():
             if (record[index] == searchValue):
                 return True
 
         # If it cannot be found, therefore return false
         return False
 
+    # This method finds every record in the other tables that refers to a record of this table by its primary key, as a
+    # list of each record's table, its position in that table, and the record. The foreign keys have indexes, so only
+    # the records that refer to the record are looked at
+    @__served
+    @__profiled
+    def findDependents(self, index):
+
+        # If index is greater than the table size or its negative, raise error
+        if (index > self.tableLength()-1 or index < 0):
+            return print("Failed to find, index out of bounds. Index likely bigger than list size.")
+
+        primaryKey = self.__getRecordByIndex(index)[0]
+
+        dependents = []
+        for dTable, field in Table.foreignKeyTables(self.tableFields[0]):
+            dRecords = dTable.__sectionRecords()
+            for position in dTable.__findPositions(field, primaryKey):
+                dependents.append([dTable, position, dRecords[position]])
+
+        return dependents
+
     # This method gets a record by its index
     def __getRecordByIndex(self, index):
 
-        # Get decrypted list of records
-        records = self.__tableToList()
-
         # If index is greater than the table size or its negative, raise error
-        if (index > len(records) - 1 or index < 0):
+        if (index > self.tableLength() - 1 or index < 0):
             return print("Failed to find, index out of bounds. Index likely bigger than list size.")
 
-        return records[index]
+        return self.__getSection()["records"][index]
 
     # This method finds a record by a search value (NOT an index, like the __getRecordByIndex method), using
-    # a sorting and a searching algorithm
+    # the field's index if it has one, or otherwise a sorting and a searching algorithm
+    @__served
+    @__profiled
     def findRecord(self, field, searchValue):
 
-        # Gets decrypted list of records
-        records = self.__tableToList()
-
         # Uses the field to find the index of the field in the fields list
-        fieldIndex = self.tableFields.index(field)
+        fieldIndex = self.schema.fieldIndexes[field]
 
-        # This uses bubble sort to sort by a field
-        records = self.__bubbleSort(records, fieldIndex)
+        # If the field has an index, the positions of the records with the search value are looked up in it, and the
+        # first of those records is returned
+        index = self.__getIndex(fieldIndex)
+        if (index is not None):
+            positions = index.get(self.__indexKey(fieldIndex, searchValue), [])
+            return -1 if len(positions) == 0 else self.__getRecordByIndex(positions[0])
+
+        # Otherwise, this gets the records sorted by the field
+        positions, keys = self.__sortedView(fieldIndex)
 
         # This uses a binary search to find a record by its field and search value
-        record = self.__binarySearch(records, fieldIndex, searchValue)
+        found = self.__binarySearch(keys, Table.__orderKey(self.__indexKey(fieldIndex, searchValue)))
+
+        return -1 if found == -1 else self.__getRecordByIndex(positions[found])
+
+    # This method finds every record with a search value in a field, using the field's index if it has one, or
+    # otherwise a linear search
+    @__served
+    @__profiled
+    def findRecords(self, field, searchValue):
+
+        positions = self.__findPositions(field, searchValue)
+        records = self.__sectionRecords()
+
+        return [records[position] for position in positions]
+
+    # This method finds the positions of every record with a search value in a field
+    def __findPositions(self, field, searchValue):
+
+        # Uses the field to find the index of the field in the fields list
+        fieldIndex = self.schema.fieldIndexes[field]
+        key = self.__indexKey(fieldIndex, searchValue)
+
+        # If the field has an index, the positions of the records are looked up in it
+        index = self.__getIndex(fieldIndex)
+        if (index is not None):
+            return list(index.get(key, []))
+
+        # Linearly search through the records and keep the position of every record that matches
+        return [position for position, record in enumerate(self.__tableToList())
+                if self.__indexKey(fieldIndex, self.__fieldValue(record, fieldIndex)) == key]
+
+    # This method finds every record with a value in a field between a low and a high value (including both), ordered
+    # by that field. It uses the field's index if it is a sorted index, or otherwise the records sorted by the field
+    @__served
+    @__profiled
+    def findRecordsInRange(self, field, lowValue, highValue):
+
+        # Uses the field to find the index of the field in the fields list
+        fieldIndex = self.schema.fieldIndexes[field]
+        lowKey = Table.__orderKey(self.__indexKey(fieldIndex, lowValue))
+        highKey = Table.__orderKey(self.__indexKey(fieldIndex, highValue))
+
+        # If the field has a sorted index, the keys between the low and high value are found by binary search, and
+        # the positions of the records for each of those keys are looked up in the index
+        index = self.__getIndex(fieldIndex)
+        if (index is not None and self.__indexedFields()[fieldIndex][0] == "sorted"):
+            section = self.__getSection()
+            sortedKeys = section["sortedKeys"][fieldIndex] if section is not None else []
+            start = bisect.bisect_left(sortedKeys, lowKey)
+            end = bisect.bisect_right(sortedKeys, highKey)
 
-        return record
+            return [section["records"][position]
+                    for orderKey in sortedKeys[start:end] for position in index[orderKey[1]]]
 
-    # This method sorts records by bubble sort
-    def __bubbleSort(self, records, sortValue):
+        # Otherwise, the records between the two values are found by binary search in the records sorted by the field
+        positions, keys = self.__sortedView(fieldIndex)
+        start = bisect.bisect_left(keys, lowKey)
+        end = bisect.bisect_right(keys, highKey)
+        records = self.__sectionRecords()
 
-        # Loops for the number of records in records
-        for record in range(len(records)):
+        return [records[position] for position in positions[start:end]]
 
-            # Loops for the remaining number of records to sort (the records that are not in the correct place)
-            for remaining in range(0, len(records)-(record+1)):
+    # This method gets the records of the table in order of a field, as a list of their positions in the table and a
+    # list of the keys they are ordered by. The keys use the type of the field, so IDs are compared as numbers and
+    # dates and times in the order they happen, and Python's sort (Timsort) keeps records with equal keys in the
+    # order they are in the table. The order is kept until the table is changed
+    def __sortedView(self, fieldIndex):
 
-                # If the current record's field is greater than the next record's field, swap their values
-                if (records[remaining][sortValue] > records[remaining + 1][sortValue]):
-                    records[remaining], records[remaining + 1] = records[remaining + 1], records[remaining]
+        section = self.__getSection()
 
-        return records
+        # If the table has no identifier in the database, it has no records
+        if (section is None):
+            return [], []
 
-    # This method searches for a record by binary search
-    def __binarySearch(self, records, field, searchValue):
+        if (fieldIndex not in section["sortedViews"]):
+            keys = [Table.__orderKey(self.__indexKey(fieldIndex, self.__fieldValue(record, fieldIndex)))
+                    for record in section["records"]]
+            positions = sorted(range(len(keys)), key=keys.__getitem__)
 
-        # Low is the lowest index value, high is the highest index value of the records
-        low, high = 0, len(records)-1
+            section["sortedViews"][fieldIndex] = (positions, [keys[position] for position in positions])
+
+        return section["sortedViews"][fieldIndex]
+
+    # This method searches the keys of a sorted view by binary search, and returns where the first key equal to the
+    # search key is, or -1 if there isn't one
+    def __binarySearch(self, keys, searchKey):
+
+        # Low is the lowest index value, high is the highest index value of the keys
+        low, high = 0, len(keys)-1
+        found = -1
 
         # Loops as long the boundaries don't overlap or cross over
         while low <= high:
@@ -427,73 +2647,110 @@ class Table():
             # Gets the midpoint between the high and low boundaries
             mid = low + (high - low)//2
 
-            # Converts the field in record's type to the searchValue's type, then compares with the search value
-            # If equal, return the record
-            if (type(searchValue)(records[mid][field]) == searchValue):
-                return records[mid]
+            # If equal, remember where it is and keep searching the lower half, in case there is an equal key before it
+            if (keys[mid] == searchKey):
+                found = mid
+                high = mid - 1
 
-            # Otherwise, shift the boundaries to half the records from the midpoint based on whether the record is
+            # Otherwise, shift the boundaries to half the keys from the midpoint based on whether the key is
             # on the lower end or the higher end
-            elif (type(searchValue)(records[mid][field]) < searchValue):
+            elif (keys[mid] < searchKey):
                 low = mid + 1
             else:
                 high = mid - 1
 
-        # If the record is not found, return -1
-        return -1
+        # If the key is not found, return -1
+        return found
 
+    # This method builds the translation tables used by the encryption and decryption methods. There is one pair of
+    # tables for each character of the key, as each key character always shifts a plain character by the same amount.
+    # They are only built once, the first time they are needed
+    @staticmethod
+    def __cipherTables():
 
-    # This method encrypts plain text to cipher text
-    def __encryption(self, plain):
-        # This represents the list of each character the encryption can convert to the cipher text
-        characters = list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz1234567890 /:@.,#~\n'")
-
-        # The key is the variable that changes how the resultant cipher is made. The larger the value and variance in
-        # characters, the more secure it is
-        key = list("T3OeM2aIXsDJp4LwPAgY")
-        cipherCharacters = []
-
-        # This variable keeps track of how far the encryption is in the key. If it reaches the end of the key,
-        # it loops back to the first character
-        keyCharCounter = 0
-        for character in plain:
-            # The index of the character, plus the index of key in relation to the characters list, modulus
-            # by the number of characters in the characters list, equals the new cipher character
-            characterNum = (characters.index(character) + characters.index(key[keyCharCounter])) % len(characters)
-            cipherCharacter = characters[characterNum]
-            cipherCharacters.append(cipherCharacter)
-
-            # Checks for whether the characters in the key has 'ran out', if so, loop back to the first character
-            keyCharCounter += 1
-            if (keyCharCounter > len(key)-1):
-                keyCharCounter = 0
-
-        # Returns the ciphered text
-        return "".join(cipherCharacters)
+        if (Table.cipherTables is None):
+            characters = Table.characters.encode("ascii")
 
-    # This method is nearly identical to the encryption method, except it has a minus instead of a plus
-    # when determining cipher character
-    def __decryption(self, cipher):
-        characters = list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz1234567890 /:@.,#~\n'")
-        key = list("T3OeM2aIXsDJp4LwPAgY")
-        plainCharacters = []
-        keyCharCounter = 0
-        for character in cipher:
-            characterNum = (characters.index(character) - characters.index(key[keyCharCounter])) % len(characters)
-            plainCharacter = characters[characterNum]
-            plainCharacters.append(plainCharacter)
+            encryptionTables = []
+            decryptionTables = []
+            for keyCharacter in Table.key:
+                # The characters list rotated by the index of the key character in relation to the characters list,
+                # so that the character at each index is the cipher character of the plain character at that index
+                shift = Table.characters.index(keyCharacter)
+                rotatedCharacters = characters[shift:] + characters[:shift]
+
+                encryptionTables.append(bytes.maketrans(characters, rotatedCharacters))
+                decryptionTables.append(bytes.maketrans(rotatedCharacters, characters))
 
-            keyCharCounter += 1
-            if (keyCharCounter > len(key)-1):
-                keyCharCounter = 0
+            Table.cipherTables = (encryptionTables, decryptionTables)
 
-        return "".join(plainCharacters)
+        return Table.cipherTables
 
+    # This method applies the translation tables to a whole text at once. Every character that uses the same key
+    # character is a slice with a step of the key's length, so each slice is translated with a single table.
+    # The keyOffset is how far through the key the first character of the text is
+    @staticmethod
+    def __translate(text, tables, keyOffset):
+
+        # Checks that every character can be converted, like the characters list did before the tables were used
+        buffer = bytearray(text.encode("ascii"))
+        if (len(buffer.translate(None, Table.characters.encode("ascii"))) > 0):
+            raise ValueError("Text contains a character that cannot be encrypted.")
+
+        keyLength = len(Table.key)
+        for keyCharCounter in range(keyLength):
+            start = (keyCharCounter - keyOffset) % keyLength
+            buffer[start::keyLength] = buffer[start::keyLength].translate(tables[keyCharCounter])
+
+        return buffer.decode("ascii")
+
+    # This method encrypts plain text to cipher text
+    # The index of each character, plus the index of the key character in relation to the characters list, modulus
+    # by the number of characters in the characters list, equals the new cipher character
+    @staticmethod
+    @__profiled
+    def __encryption(plain, keyOffset=0):
+        Table.__count("encryptedCharacters", len(plain))
+        return Table.__translate(plain, Table.__cipherTables()[0], keyOffset)
+
+    # This method is nearly identical to the encryption method, except it has a minus instead of a plus
+    # when determining cipher character
+    @staticmethod
+    @__profiled
+    def __decryption(cipher, keyOffset=0):
+        Table.__count("decryptedCharacters", len(cipher))
+        return Table.__translate(cipher, Table.__cipherTables()[1], keyOffset)
 
 #
 # VALIDATION
 #
 
+# The regular expressions of the format checks, which are compiled once when the program starts rather than each time a
+# value is checked
+
+# It first checks if the email is isolated by itself (\b)
+# Then it checks if it has any number of characters (the username), then an @, then more characters (domain name)
+# then a '.', then at least 2 or more characters (the domain)
+emailPattern = re.compile(r"\b[\w]+@[A-Za-z\d]+\.[A-Z|a-z]{2,}\b")
+
+# It first checks for a number with a length of 1 to 3 (house number), then space,
+# then any number of characters (house address name), then space,
+# then it checks for more characters (place, street, etc),
+# then it checks for 1 or 2 letters, then a number and allow an extra letter/number (first part of postcode),
+# then finally, after another space, check for a number then 2 letters (second part of postcode)
+addressPattern = re.compile("[0-9]{1,3} [A-Za-z ]+ [A-Za-z]+ [A-Z]{1,2}[0-9][A-Z0-9]? [0-9][A-Z]{2}")
+
+# It accepts EITHER 2 then a number between 0 and 3 (hours from 20 to 23), then :,
+# then number between 0 and 5 and then 0 and 9 (minutes)
+# OR a number between 0 to 1, then 0 to 9 (hours from 00 to 19), then :, then 0 to 5, then finally 0 to 9 (minutes)
+timePattern = re.compile("(2[0-3]:[0-5][0-9]|[0-1][0-9]:[0-5][0-9])")
+
+# It checks if the value is in the format of dd/mm/yy
+datePattern = re.compile("[0-3][0-9]/[0-1][0-9]/[0-9][0-9]")
+
+# Positions in the business
+positions = {"Manager", "Counter Attendant", "Repairman", "Maintenance"}
+
 # This function checks to see if the day is valid based on the month
 def dateCheck(day, month):
 
@@ -510,181 +2767,106 @@ def dateCheck(day, month):
     else:
         return True
 
-# This function contains different types of string format checks
-def formatCheck(value, type):
+# Phone validation, which is false unless the number is exactly 11 digits
+def phoneFormat(value):
+    return len(value) == 11 and value.isdigit()
 
-    # Assume the value is not formatted correctly
-    boolFormat = False
+# Name validation, which is false if there is a character in the string which is a digit
+def nameFormat(value):
 
-    # Phone validation
-    if (type == "phone"):
-
-        # Returns false if the number of digits is not exactly 11
-        if (len(value) != 11):
+    for character in value:
+        if (character.isdigit()):
             return False
 
-        # Assume true, unless there is a character in the string which is not a digit
-        boolFormat = True
-        for character in value:
-            if (character.isdigit() == False):
-                boolFormat = False
-
-    # Name validation
-    elif (type == "name"):
-
-        # Assume true, unless there is a character in the string which is a digit
-        boolFormat = True
-        for character in value:
-            if (character.isdigit()):
-                boolFormat = False
-
-    # Email validation
-    elif (type == "email"):
-
-        # This uses a regular expression
-        # It first checks if the email is isolated by itself (\b)
-        # Then it checks if it has any number of characters (the username), then an @, then more characters (domain name)
-        # then a '.', then at least 2 or more characters (the domain)
-
-        # boolFormat will be either None, or a match object, which is considered 'true'
-        boolFormat = re.match(r"\b[\w]+@[A-Za-z\d]+\.[A-Z|a-z]{2,}\b", value)
-
-    # Home address validation
-    elif (type == "address"):
-
-        # This uses a regular expression
-        # It first checks for a number with a length of 1 to 3 (house number), then space,
-        # then any number of characters (house address name), then space,
-        # then it checks for more characters (place, street, etc),
-        # then it checks for 1 or 2 letters, then a number and allow an extra letter/number (first part of postcode),
-        # then finally, after another space, check for a number then 2 letters (second part of postcode)
-
-        # boolFormat will be either None, or a match object, which is considered 'true'
-        boolFormat = re.match("[0-9]{1,3} [A-Za-z ]+ [A-Za-z]+ [A-Z]{1,2}[0-9][A-Z0-9]? [0-9][A-Z]{2}", value)
-
-    # Time validation
-    elif (type == "time"):
+    return True
 
-        # This uses a regular expression
-        # It accepts EITHER 2 then a number between 0 and 3 (hours from 20 to 23), then :,
-        # then number between 0 and 5 and then 0 and 9 (minutes)
-        # OR a number between 0 to 1, then 0 to 9 (hours from 00 to 19), then :, then 0 to 5, then finally 0 to 9 (minutes)
+# Email validation
+def emailFormat(value):
+    return emailPattern.match(value) is not None
 
-        # boolFormat will be either None, or a match object, which is considered 'true'
-        boolFormat = re.match("(2[0-3]:[0-5][0-9]|[0-1][0-9]:[0-5][0-9])", value)
+# Home address validation
+def addressFormat(value):
+    return addressPattern.match(value) is not None
 
-    # Date validation
-    elif (type == "date"):
+# Time validation
+def timeFormat(value):
+    return timePattern.match(value) is not None
 
-        # This uses a regular expression
-        # It checks if the value is in the format of dd/mm/yy
-        boolFormat = re.match("[0-3][0-9]/[0-1][0-9]/[0-9][0-9]", value)
+# Date validation
+def dateFormat(value):
 
-        if (boolFormat == False):
-            return boolFormat
-        else:
-            # Gets the day and month from the string
-            day = int(value.split("/")[0])
-            month = int(value.split("/")[1])
-
-            # Checks if the day and months are valid (e.g no 40th month, or 72th day, etc)
-            boolFormat = dateCheck(day, month)
-
-    # Position validation
-    elif (type == "position"):
+    if (datePattern.match(value) is None):
+        return False
 
-        # Positions in the business
-        positions = ["Manager", "Counter Attendant", "Repairman", "Maintenance"]
+    # Gets the day and month from the string
+    day = int(value.split("/")[0])
+    month = int(value.split("/")[1])
 
-        # If the value is equal to one of these positions, return true
-        if (value in positions):
-            boolFormat = True
+    # Checks if the day and months are valid (e.g no 40th month, or 72th day, etc)
+    return dateCheck(day, month)
 
-    # Convert any 'None' results to 'False'
-    if (boolFormat == None):
-        boolFormat = False
+# Position validation, which is true if the value is equal to one of the positions
+def positionFormat(value):
+    return value in positions
 
-    # Returns whether or not the value has passed it's validation
-    return boolFormat
+# The function of each type of string format check
+formatChecks = {"phone": phoneFormat, "name": nameFormat, "email": emailFormat, "address": addressFormat,
+                "time": timeFormat, "date": dateFormat, "position": positionFormat}
 
 # This function checks if a value has surpassed its max length
 def lengthCheck(value, maxLength):
-
-    # If no max length specified, return true
-    if (maxLength == ""):
-        return True
-
-    # Assume false, unless the length of the value is not greater than the max length
-    boolLength = False
-    if (len(value) <= maxLength):
-        boolLength = True
-
-    return boolLength
+    return len(value) <= maxLength
 
 # This function checks a value (of int or float) is between a specified range
 def rangeCheck(value, maxRange, minRange=0):
+    return value <= maxRange and value >= minRange
 
-    # Assume false, unless the value is between the max and min range
-    boolRange = False
-    if (value <= maxRange and value >= minRange):
-        boolRange = True
+# The value is an int if it can be cast into one
+def intType(value):
 
-    return boolRange
+    try:
+        int(value)
+    except (TypeError, ValueError, OverflowError):
+        return False
 
-# This function checks if a value is of the correct type by using exception handling
-def typeCheck(value, valueType):
+    return True
 
-    boolType = False
+# The value is a float if it can be cast into one
+def floatType(value):
 
-    # If the value is supposed to be an int, try to cast it into an int, and if it failed, return false
-    if (valueType is int):
-        try:
-            integer = int(value)
-            if (type(integer) is valueType):
-                boolType = True
-        except:
-            boolType = False
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
 
-    # If the value is supposed to be a float, try to cast it into a float, and if it failed, return false
-    if (valueType is float):
-        try:
-            floatValue = float(value)
-            if (type(floatValue) is valueType):
-                boolType = True
-        except:
-            boolType = False
+    return True
 
-    # If the value is supposed to be string, try to cast it into an string, and if it failed, return false
-    if (valueType is str):
-        try:
-            string = str(value)
-            if (type(string) is valueType):
-                boolType = True
-        except:
-            boolType = False
+# If the value is supposed to be a bool, it must be stored as either 0 or 1
+def boolType(value):
+    return str(value) in ("0", "1")
 
-    return boolType
+# The function that checks each type of value, other than text, which any value can be
+typeChecks = {int: intType, float: floatType, bool: boolType}
 
 # This function checks to see if a foreign key existed in the table where it is a primary key
 # Which makes the primary and foreign key fields truly relational;
 # a foreign key cannot exist if it doesn't exist as a primary key
 def foreignKeyCheck(value, sField):
 
-    # Iterates through the tableIDs in the tableData dictionary
-    for tableID in range(len(Table.enumOfTableData)):
-
-        # Iterates through each field in the table
-        for field in Table.enumOfTableData[tableID]['fields']:
-
-            # If the field is the same as the foreign key field but is a primary key, get the relevant table
-            if (field[0] == sField and field[1][0] == "P"):
+    # Gets the table that has the foreign key field as its primary key
+    checkTable = Table.primaryKeyTable(sField)
 
-                tableName = Table.enumOfTableData[tableID]["name"]
-                checkTable = Table(tableName)
+    # If no table has the field as its primary key, the record can't exist
+    if (checkTable is None):
+        return False
 
-    # Verify that the record exists with the correct key
+    # Verify that the record exists with the correct key. The primary key always has an index, which is kept up to
+    # date as records are created, amended and deleted, so this is a single look up in the cache
     return checkTable.verifyRecordExistence(value)
 
+# The schema of the tables is compiled once, when the program starts, once the checks that its fields use are defined
+Table.compileSchema()
+
 
 #
 # FRONT END
@@ -695,30 +2877,406 @@ def main():
     # Introductory message
     print("| | | Heard's Computer Cafe | | |" + "\n")
 
-    # Commence backup every time the program is run
-    backup()
+    # Whilst profiling, the profile is printed when the program closes
+    if (Table.profiling):
+        atexit.register(Table.printProfile)
+
+    # The metrics are written one last time when the program closes, and served for as long as it runs
+    if (Table.metricsFile is not None):
+        atexit.register(Table.writeMetrics)
+
+    if (Table.metricsPort is not None):
+        startMetricsServer(Table.metricsPort)
+
+    # Started with --server (and optionally an address), this terminal runs the database server instead
+    if (len(sys.argv) > 1 and sys.argv[1] == "--server"):
+        return runServer(sys.argv[2] if len(sys.argv) > 2 else Table.serverAddress)
+
+    # Started with --connect and an address, this terminal must use the database server at that address
+    if (len(sys.argv) > 2 and sys.argv[1] == "--connect"):
+        if (Table.connectServer(sys.argv[2]) == False):
+            return print(f"Could not connect to the database server at {sys.argv[2]}.")
+
+    # Otherwise, if a database server is running, this terminal uses it, and the server looks after the files.
+    # If not, this terminal uses the files itself
+    elif (Table.connectServer() == False):
+
+        # Writes any changes left in the journal, from when the program was last closed, into the database
+        Table(0).compactDatabase()
+
+        # Commence backup every time the program is run
+        backup()
 
     # Go to the login function
     login()
 
-# This function makes a backup of the database
-def backup():
+# This class answers the requests made to the metrics server, giving the metrics for /metrics
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
 
-    # Opens the backup file in write mode
-    backupFile = open("db_backup.txt", "w")
+        if (self.path.split("?")[0] != "/metrics"):
+            return self.send_error(404)
+
+        body = Table.metricsText().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # The requests are not printed, as they would be printed over the menus
+    def log_message(self, format, *args):
+        pass
+
+# This function serves the metrics on a port of localhost over HTTP, on its own thread, so that the metrics can be
+# collected whilst the program is waiting for the user
+def startMetricsServer(port):
 
-    # Attempts to open the file, if it can't, create a new one, then finally open the file
     try:
-        file = open("db.txt")
-    except:
-        file = open("db.txt", "w")
+        metricsServer = http.server.ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    except OSError:
+        return print(f"Failed to serve the metrics on port {port}.")
+
+    threading.Thread(target=metricsServer.serve_forever, daemon=True).start()
+
+# This function splits the address of the database server into the host and port for a TCP address (such as
+# "127.0.0.1:5050"), or the path of the Unix socket and None for any other address
+def splitServerAddress(address):
+
+    host, separator, port = address.rpartition(":")
+    if (separator == "" or port.isdigit() == False):
+        return address, None
+
+    return host, int(port)
+
+# This function runs the database server. If no server is already running at the address, it writes any changes left
+# in the journal into the database and makes a backup, as every terminal does when it starts, then serves the
+# terminals that connect until it is stopped
+def runServer(address):
+
+    host, port = splitServerAddress(address)
+
+    # Nothing is changed whilst another server is using the database at this address
+    if (Table.connectServer(address)):
+        Table.serverConnection.close()
+        Table.serverConnection = None
+        return print(f"A database server is already running at {address}.")
+
+    # A Unix socket left behind by a server that didn't stop properly is removed
+    if (port is None and os.path.exists(host)):
+        os.remove(host)
+
+    Table(0).compactDatabase()
+    backup()
+
+    print(f"Serving the database at {address}. Press Ctrl+C to stop.")
+    try:
+        asyncio.run(serveDatabase(host, port))
+    except KeyboardInterrupt:
+        print("Stopped the database server.")
     finally:
-        file = open("db.txt")
+        if (port is None and os.path.exists(host)):
+            os.remove(host)
 
-        # Write the contents of the main file into the backup file
-        backupFile.write(file.read())
+# This function starts the database server on a Unix socket, or on a TCP port if one is given. Every terminal's
+# requests are run one at a time by the same Table classes, so they all share one cache of the database.
+# "lock" is held whilst a request is run, and "owner" is the terminal with a transaction in progress, which keeps the
+# lock until its transaction ends, so no other terminal sees or changes the database part way through the transaction
+async def serveDatabase(host, port):
 
-        file.close()
+    server = {"lock": asyncio.Lock(), "owner": None}
+    handler = lambda reader, writer: serveClient(reader, writer, server)
+
+    # The requests of a terminal can be large, such as creating many records at once
+    if (port is None):
+        databaseServer = await asyncio.start_unix_server(handler, path=host, limit=1 << 24)
+    else:
+        databaseServer = await asyncio.start_server(handler, host, port, limit=1 << 24)
+
+    async with databaseServer:
+        await databaseServer.serve_forever()
+
+# This function serves a single terminal connected to the database server, reading each of its requests, running
+# them, and sending back their responses, until the terminal disconnects
+async def serveClient(reader, writer, server):
+
+    try:
+        while True:
+            request = await reader.readline()
+            if (request == b""):
+                break
+
+            # The lock is taken for the request, unless this terminal already holds it for its transaction
+            if (server["owner"] is not writer):
+                await server["lock"].acquire()
+
+            try:
+                response = Table.serveRequest(json.loads(request))
+            except ValueError as error:
+                response = {"output": "", "error": f"ValueError: {error}"}
+
+            # If a transaction is in progress after the request, the lock is kept until it ends
+            if (Table.transactionEntries is not None):
+                server["owner"] = writer
+            else:
+                server["owner"] = None
+                server["lock"].release()
+
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        # If the terminal disconnected part way through a transaction, its changes are rolled back
+        if (server["owner"] is writer):
+            Table.rollbackTransaction()
+            server["owner"] = None
+            server["lock"].release()
+
+        writer.close()
+
+# This function makes a backup of the database. Each backup is a snapshot, which lists the blocks the database files
+# are made of. A block is stored compressed, named by the hash of its contents, so a block that hasn't changed since an
+# earlier backup isn't stored again. The files are read a block at a time, so the whole database is never in memory.
+# Only the most recent backups are kept, and the blocks that no kept backup uses are removed
+def backup():
+
+    blocksFolder = os.path.join(Table.backupFolder, "blocks")
+    os.makedirs(blocksFolder, exist_ok=True)
+
+    # The backup is made whilst holding the backup lock, from writing its blocks until the blocks no backup uses are
+    # removed, so that another terminal making a backup at the same time doesn't get in the way
+    with Table.backingUp():
+
+        # The snapshot lists each file of the database, then the hash and length of each of its blocks. The files are
+        # read whilst holding the read lock, so another terminal can't write the journal into a new database in between.
+        # Other terminals can still add to the journal, so each file is only read up to the size it had when the backup
+        # started it
+        snapshotLines = []
+        with Table.readingFiles():
+            for databaseFile in [Table.databaseFile, Table.segmentFile, Table.journalFile]:
+                if (os.path.exists(databaseFile) == False):
+                    continue
+
+                # The segment file is split where each segment starts, so the blocks of a segment that hasn't changed
+                # are the same as in the last backup
+                boundaries = Table.segmentBoundaries() if databaseFile == Table.segmentFile else []
+
+                fileSize = os.path.getsize(databaseFile)
+                snapshotLines.append(f"#~{databaseFile}:{fileSize}")
+                with open(databaseFile, "rb") as file:
+                    position = 0
+                    while (position < fileSize):
+                        blockSize = min([Table.backupBlockSize, fileSize - position] + [boundary - position for boundary in boundaries if boundary > position])
+                        block = file.read(blockSize)
+                        if (len(block) == 0):
+                            break
+
+                        blockHash = hashlib.sha256(block).hexdigest()
+                        blockFile = os.path.join(blocksFolder, blockHash)
+
+                        # The block is only written if no earlier backup has it
+                        if (os.path.exists(blockFile) == False):
+                            with open(blockFile + ".tmp", "wb") as compressedFile:
+                                compressedFile.write(zlib.compress(block))
+                            os.replace(blockFile + ".tmp", blockFile)
+
+                        snapshotLines.append(f"{blockHash},{len(block)}")
+                        position += len(block)
+
+        # The snapshot is numbered after the last one
+        snapshots = backupSnapshots()
+        snapshotNum = snapshots[-1] + 1 if len(snapshots) > 0 else 0
+
+        # The snapshot is written next to where it goes, and renamed into place once it is on the disk, so a backup that
+        # is stopped part way through doesn't leave half a snapshot
+        snapshotFile = os.path.join(Table.backupFolder, f"snapshot_{snapshotNum}.txt")
+        with open(snapshotFile + ".tmp", "w") as file:
+            file.write("\n".join(snapshotLines))
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(snapshotFile + ".tmp", snapshotFile)
+        Table.syncDirectory(snapshotFile)
+
+        # Removes the oldest snapshots, then the blocks that aren't in any of the snapshots that are left
+        for oldSnapshotNum in backupSnapshots()[:-Table.backupCount]:
+            os.remove(os.path.join(Table.backupFolder, f"snapshot_{oldSnapshotNum}.txt"))
+
+        usedBlocks = set()
+        for keptSnapshotNum in backupSnapshots():
+            for databaseFile, blocks in readSnapshot(keptSnapshotNum) or []:
+                usedBlocks.update([blockHash for blockHash, blockLength in blocks])
+
+        for blockHash in os.listdir(blocksFolder):
+            if (blockHash not in usedBlocks):
+                os.remove(os.path.join(blocksFolder, blockHash))
+
+    return snapshotNum
+
+# This function gets the numbers of the backups that are kept, from the oldest to the newest
+def backupSnapshots():
+
+    if (os.path.isdir(Table.backupFolder) == False):
+        return []
+
+    return sorted([int(fileName[9:-4]) for fileName in os.listdir(Table.backupFolder)
+                   if re.fullmatch(r"snapshot_[0-9]+\.txt", fileName)])
+
+# This function reads a backup's snapshot, as a list of each database file's name and its blocks, where each block is
+# its hash and length. If the snapshot can't be read, or the lengths of a file's blocks don't add up to the file's
+# size, the snapshot is damaged, and None is returned
+def readSnapshot(snapshotNum):
+
+    try:
+        with open(os.path.join(Table.backupFolder, f"snapshot_{snapshotNum}.txt"), "r") as snapshotFile:
+            snapshotLines = snapshotFile.read().split("\n")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    snapshot = []
+    fileSizes = []
+    try:
+        for snapshotLine in snapshotLines:
+            if (snapshotLine.startswith("#~")):
+                databaseFile, fileSize = snapshotLine[2:].rsplit(":", 1)
+                snapshot.append([databaseFile, []])
+                fileSizes.append(int(fileSize))
+            elif (snapshotLine != ""):
+                blockHash, blockLength = snapshotLine.split(",")
+                snapshot[-1][1].append([blockHash, int(blockLength)])
+    except (ValueError, IndexError):
+        return None
+
+    for [databaseFile, blocks], fileSize in zip(snapshot, fileSizes):
+        if (sum([blockLength for blockHash, blockLength in blocks]) != fileSize):
+            return None
+
+    return snapshot
+
+# This function checks that every block of a backup is there and has not been changed, by decompressing it and checking
+# its hash and length. It prints each problem it finds, and returns whether the backup can be restored
+def verifyBackup(snapshotNum):
+
+    if (snapshotNum not in backupSnapshots()):
+        print(f"Backup {snapshotNum} doesn't exist.")
+        return False
+
+    snapshot = readSnapshot(snapshotNum)
+    if (snapshot is None):
+        print(f"The snapshot of backup {snapshotNum} is damaged.")
+        return False
+
+    valid = True
+    for databaseFile, blocks in snapshot:
+        for blockHash, blockLength in blocks:
+            try:
+                with open(os.path.join(Table.backupFolder, "blocks", blockHash), "rb") as blockFile:
+                    block = zlib.decompress(blockFile.read())
+            except (OSError, zlib.error):
+                print(f"Block {blockHash} of {databaseFile} is missing or damaged.")
+                valid = False
+                continue
+
+            if (len(block) != blockLength or hashlib.sha256(block).hexdigest() != blockHash):
+                print(f"Block {blockHash} of {databaseFile} doesn't match its hash.")
+                valid = False
+
+    return valid
+
+# This function restores the database from a backup, once the backup has been verified. Each file is written a block
+# at a time next to the old one, then renamed over it, and the database files that weren't in the backup are removed
+def restoreBackup(snapshotNum):
+
+    if (verifyBackup(snapshotNum) == False):
+        return print("Failed to restore, the backup is damaged.")
+
+    # The files are replaced whilst no other terminal can read or write them, or make a backup
+    snapshot = readSnapshot(snapshotNum)
+    with Table.backingUp(), Table.replacingFiles():
+        for databaseFile, blocks in snapshot:
+            with open(databaseFile + ".tmp", "wb") as file:
+                for blockHash, blockLength in blocks:
+                    with open(os.path.join(Table.backupFolder, "blocks", blockHash), "rb") as blockFile:
+                        file.write(zlib.decompress(blockFile.read()))
+
+                file.flush()
+                os.fsync(file.fileno())
+
+            os.replace(databaseFile + ".tmp", databaseFile)
+
+        for databaseFile in [Table.databaseFile, Table.segmentFile, Table.journalFile]:
+            if (databaseFile not in [restoredFile for restoredFile, blocks in snapshot] and os.path.exists(databaseFile)):
+                os.remove(databaseFile)
+
+        Table.syncDirectory(Table.databaseFile)
+
+    print(f"Successfully restored backup {snapshotNum}.")
+
+# This function goes through the process of verifying or restoring a backup with the user
+def backupsProcess(account):
+
+    snapshots = backupSnapshots()
+
+    # Lists the backups, with when each was made
+    print("Backups:")
+    for snapshotNum in snapshots:
+        snapshotFile = os.path.join(Table.backupFolder, f"snapshot_{snapshotNum}.txt")
+        print(f"({snapshotNum}): {time.strftime('%d/%m/%y %H:%M', time.localtime(os.path.getmtime(snapshotFile)))}")
+
+    if (len(snapshots) == 0):
+        print("No Backups (0)")
+        return tablesMenu(account)
+
+    # Attempts to get a backup that exists
+    snapshotNum = input("Select backup by index: ")
+    while (snapshotNum.isdigit() == False or int(snapshotNum) not in snapshots):
+        print("Invalid. Try again.")
+        snapshotNum = input("Select backup by index: ")
+
+    print("0: Verify Backup, 1: Restore Backup, 2: Back to Table Selection")
+    actionSelection = input()
+    while (actionSelection not in ["0", "1", "2"]):
+        print("Not valid. Try again.")
+        actionSelection = input()
+
+    # Verify backup
+    if (actionSelection == "0" and verifyBackup(int(snapshotNum))):
+        print(f"Backup {snapshotNum} is complete.")
+
+    # Restore backup, after confirming with the user
+    elif (actionSelection == "1"):
+        print("\nAre you sure you want to replace the database with this backup? (Y/N)")
+        if (input().lower() in ["yes", "y"]):
+            restoreBackup(int(snapshotNum))
+        else:
+            print("Cancelled restore.")
+
+    return tablesMenu(account)
+
+# This function shows the manager the statistics of the database as they are now, and lets them turn profiling on or
+# off, or start it again from now
+def statisticsProcess(account):
+
+    print("Statistics:")
+    Table.printProfile()
+
+    print("0: Refresh, 1: Turn Profiling On, 2: Turn Profiling Off, 3: Reset Statistics, 4: Back to Table Selection")
+    actionSelection = input()
+    while (actionSelection not in ["0", "1", "2", "3", "4"]):
+        print("Not valid. Try again.")
+        actionSelection = input()
+
+    if (actionSelection == "4"):
+        return tablesMenu(account)
+
+    if (actionSelection in ["1", "2"]):
+        Table.setProfiling(actionSelection == "1")
+    elif (actionSelection == "3"):
+        Table.resetProfile()
+
+    return statisticsProcess(account)
 
 # This function allows the user to login into their account and access the rest of the program
 def login():
@@ -745,7 +3303,7 @@ def login():
     if (password == "exit"): return exit()
 
     # If the record for the account wasn't found that contained both the correct username and password, then the details were incorrect
-    while (loginTable.verifyRecordExistence(username, 2) == False or loginTable.verifyRecordExistence(password, 3) == False):
+    while (verifyLogin(loginTable, username, password) == False):
         print("Username or Password invalid, please try again.")
         print("Type 'exit' at any point to quit the program.")
         username = input("Enter username: ")
@@ -759,40 +3317,51 @@ def login():
         if (password == "exit"): return exit()
 
     # Forms a dictionary containing both the account and staff details of the user
-    accountData = updateAccountData(username)
+    with Table.measure("updateAccountData"):
+        accountData = updateAccountData(username)
 
     # Go to home page
     return tablesMenu(accountData)
 
+# This function checks that an account has the username and password, timing each check, without the time the user
+# takes to type them
+def verifyLogin(loginTable, username, password):
+
+    with Table.measure("login"):
+        return loginTable.verifyRecordExistence(username, 2) and loginTable.verifyRecordExistence(password, 3)
+
 # This function brings up the list of options a user can do
 def tablesMenu(account, showTable=True):
 
     # This lists all the tables in the table class by getting its 'metadata'
     listOfTables = []
-    for table in Table.enumOfTableData.values():
+    for table in Table.schemaTables.values():
 
         # Prevents a user with the position of 'Maintenance' to gain access to unauthorised tables
-        if (account['staffDetails'][6] == "Maintenance" and table['name'] not in ["Computer Status"]):
+        if (account['staffDetails'][6] == "Maintenance" and table.name not in ["Computer Status"]):
             continue
 
         # Prevents a user with the position of 'Repairman' to gain access to unauthorised tables
-        if (account['staffDetails'][6] == "Repairman" and table['name'] not in ["Repair Reservations", "Customer Details"]):
+        if (account['staffDetails'][6] == "Repairman" and table.name not in ["Repair Reservations", "Customer Details"]):
             continue
 
         # Prevents a user with the position of 'Counter Attendant' to gain access to unauthorised tables
-        if (account['staffDetails'][6] == "Counter Attendant" and table['name'] not in ["Computer Reservations","Customer Details", "Stocks", "Computer Status"]):
+        if (account['staffDetails'][6] == "Counter Attendant" and table.name not in ["Computer Reservations","Customer Details", "Stocks", "Computer Status"]):
             continue
 
         # Creates puts the index and table name in it's own array
-        tableData = [len(listOfTables), table['name']]
+        tableData = [len(listOfTables), table.name]
 
         # Insert the tableData into the list (2d array)
         listOfTables.append(tableData)
 
-    # If the account belongs to the manager role, give the option to create an account and reset a password
+    # If the account belongs to the manager role, give the option to create an account, reset a password, verify
+    # or restore a backup, and see the statistics of the database
     if (account['staffDetails'][6] == "Manager"):
         listOfTables.append([len(listOfTables), "Create Account"])
         listOfTables.append([len(listOfTables), "Reset Account Password"])
+        listOfTables.append([len(listOfTables), "Backups"])
+        listOfTables.append([len(listOfTables), "Statistics"])
 
     # Output the tables that can be selected, and also the option to access personal details and to close the program
     if (showTable == True):
@@ -826,13 +3395,21 @@ def tablesMenu(account, showTable=True):
                 return tablesMenu(account, False)
 
         # Create account option only for Manager
-        if (tableSelection == len(listOfTables)-2 and account['staffDetails'][6] == "Manager"):
+        if (tableSelection == len(listOfTables)-4 and account['staffDetails'][6] == "Manager"):
             return createAccount()
 
         # Reset account password option only for Manager
-        if (tableSelection == len(listOfTables)-1 and account['staffDetails'][6] == "Manager"):
+        if (tableSelection == len(listOfTables)-3 and account['staffDetails'][6] == "Manager"):
             return resetAccountPassword(account)
 
+        # Backups option only for Manager
+        if (tableSelection == len(listOfTables)-2 and account['staffDetails'][6] == "Manager"):
+            return backupsProcess(account)
+
+        # Statistics option only for Manager
+        if (tableSelection == len(listOfTables)-1 and account['staffDetails'][6] == "Manager"):
+            return statisticsProcess(account)
+
         # Personal details page for all users
         if (tableSelection == len(listOfTables)):
             return personalDetails(account)
@@ -844,6 +3421,13 @@ def tablesMenu(account, showTable=True):
         # Converts table id into table name
         tableSelection = listOfTables[int(tableSelection)][1]
 
+    # The backups and statistics options can also be selected by their names, as they aren't tables
+    if (tableSelection == "Backups"):
+        return backupsProcess(account)
+
+    if (tableSelection == "Statistics"):
+        return statisticsProcess(account)
+
     # Once table is selected, go to the table screen
     tableManipulation(tableSelection, account)
 
@@ -1001,18 +3585,26 @@ def personalDetails(account):
     account = updateAccountData(account['account'][2])
     personalDetails(account)
 
-# This function goes to the database viewer page, based on the table input and user account
-def tableManipulation(tableSelection, account):
+# This function goes to the database viewer page, based on the table input and user account. It shows a page of the
+# table and lets the user create, delete, amend and search its records, and move between its pages.
+# view holds how the table is shown (its page, page size, sort field, filters and fields), and whether the table is
+# shown again after each action. redraw is False when the table shouldn't be shown again straight away
+def tableManipulation(tableSelection, account, view=None, redraw=True):
 
     # Instantiates table
     table = Table(tableSelection)
 
-    # Prints the table name, then the table
-    print(f"{table.tableName}:")
-    table.listToViewable()
+    # The table starts on its first page, sorted as it is in the database, with every record and field shown
+    if (view is None):
+        view = {"page": 0, "pageSize": Table.pageSize, "sortField": None, "filters": {}, "fields": None, "redraw": True}
+
+    # Prints the table name, then the page of the table
+    if (redraw == True):
+        print(f"{table.tableName}:")
+        view["nextPage"] = table.listPage(view["page"], view["pageSize"], view["sortField"], view["filters"], view["fields"])
 
     # Options
-    print("0: Create Record, 1: Delete Record, 2: Amend Record, 3: Search Record, 4: Back to Table Selection")
+    print("0: Create Record, 1: Delete Record, 2: Amend Record, 3: Search Record, 4: Back to Table Selection, 5: Next Page, 6: Previous Page, 7: View Settings")
 
     # Attempt to get an input within the option indexes
     actionSelection = input()
@@ -1022,10 +3614,10 @@ def tableManipulation(tableSelection, account):
         actionSelection = int(actionSelection)
     except:
         print("Input is not an integer. Try again.")
-        return tableSelection(table, account)
+        return tableManipulation(tableSelection, account, view, False)
 
     # Test for actionSelection is an int within range of the options
-    while (actionSelection not in range(0, 5)):
+    while (actionSelection not in range(0, 8)):
         print("Not valid. Try again.")
         actionSelection = input()
 
@@ -1033,7 +3625,7 @@ def tableManipulation(tableSelection, account):
             actionSelection = int(actionSelection)
         except:
             print("Input is not an integer. Try again.")
-            return tableSelection(table, account)
+            return tableManipulation(tableSelection, account, view, False)
 
     # Create record
     if (actionSelection == 0):
@@ -1041,10 +3633,10 @@ def tableManipulation(tableSelection, account):
         # Check if user has required permissions to change data in table
         if ((table.tableName == "Computer Status" and account['staffDetails'][6] == "Counter Attendant") or (table.tableName == "Transaction History")):
             print("This table cannot be amended.")
-            return tableManipulation(tableSelection, account)
+            return tableManipulation(tableSelection, account, view, False)
 
         createRecordProcess(table, account)
-        return tableManipulation(tableSelection, account)
+        return tableManipulation(tableSelection, account, view, view["redraw"])
 
     # Delete record
     elif (actionSelection == 1):
@@ -1052,10 +3644,10 @@ def tableManipulation(tableSelection, account):
         # Check if user has required permissions to change data in table
         if ((table.tableName == "Computer Status" and account['staffDetails'][6] == "Counter Attendant") or (table.tableName == "Transaction History")):
             print("This table cannot be amended.")
-            return tableManipulation(tableSelection, account)
+            return tableManipulation(tableSelection, account, view, False)
 
         deleteRecordProcess(table, account)
-        return tableManipulation(tableSelection, account)
+        return tableManipulation(tableSelection, account, view, view["redraw"])
 
     # Amend record
     elif (actionSelection == 2):
@@ -1063,21 +3655,93 @@ def tableManipulation(tableSelection, account):
         # Check if user has required permissions to change data in table
         if ((table.tableName == "Computer Status" and account['staffDetails'][6] == "Counter Attendant") or (table.tableName == "Transaction History")):
             print("This table cannot be amended.")
-            return tableManipulation(tableSelection, account)
+            return tableManipulation(tableSelection, account, view, False)
 
         amendRecordProcess(table, account)
-        return tableManipulation(tableSelection, account)
+        return tableManipulation(tableSelection, account, view, view["redraw"])
 
     # Search record
     elif (actionSelection == 3):
 
         searchRecordProcess(table)
-        return tableManipulation(tableSelection, account)
+        return tableManipulation(tableSelection, account, view, view["redraw"])
 
     # Goes back to table selection
     elif (actionSelection == 4):
         return tablesMenu(account)
 
+    # Goes to the next page, if there is one
+    elif (actionSelection == 5):
+        if (view.get("nextPage", True) == False):
+            print("This is the last page.")
+            return tableManipulation(tableSelection, account, view, False)
+
+        view["page"] += 1
+        return tableManipulation(tableSelection, account, view)
+
+    # Goes to the previous page, if there is one
+    elif (actionSelection == 6):
+        if (view["page"] == 0):
+            print("This is the first page.")
+            return tableManipulation(tableSelection, account, view, False)
+
+        view["page"] -= 1
+        return tableManipulation(tableSelection, account, view)
+
+    # Changes how the table is shown, then shows it from the first page
+    elif (actionSelection == 7):
+        viewSettingsProcess(table, view)
+        view["page"] = 0
+        return tableManipulation(tableSelection, account, view)
+
+# This function goes through the process of changing how a table is shown with the user. Leaving an input blank keeps
+# the setting as it is
+def viewSettingsProcess(table, view):
+
+    listOfFields = '\n'.join(table.tableFields)
+    print(f"Fields:\n{listOfFields}")
+
+    # Gets the number of records on each page
+    pageSize = input(f"Input number of records per page ({view['pageSize']}): ")
+    while (pageSize != "" and (pageSize.isdigit() == False or int(pageSize) == 0)):
+        print("Input is not a positive integer. Please try again.")
+        pageSize = input(f"Input number of records per page ({view['pageSize']}): ")
+
+    if (pageSize != ""):
+        view["pageSize"] = int(pageSize)
+
+    # Gets the field to sort by, or 'None' to show the records in the order they are in the database
+    sortField = input(f"Input field to sort by, or 'None' ({view['sortField']}): ")
+    while (sortField not in ["", "None"] and sortField not in table.schema.fieldIndexes):
+        print("Invalid. Try again (it is the name of the field, not index)")
+        sortField = input(f"Input field to sort by, or 'None' ({view['sortField']}): ")
+
+    if (sortField != ""):
+        view["sortField"] = None if sortField == "None" else sortField
+
+    # Gets the filters as field=value, separated by commas, or 'None' to show every record
+    filters = input(f"Input filters as field=value separated by commas, or 'None' ({view['filters']}): ")
+    while (filters not in ["", "None"] and any([filter.count("=") != 1 or filter.split("=")[0] not in table.schema.fieldIndexes for filter in filters.split(",")])):
+        print("Invalid. Try again (each filter is the name of the field, then '=', then the value)")
+        filters = input(f"Input filters as field=value separated by commas, or 'None' ({view['filters']}): ")
+
+    if (filters != ""):
+        view["filters"] = {} if filters == "None" else dict([filter.split("=") for filter in filters.split(",")])
+
+    # Gets the fields to show, separated by commas, or 'None' to show every field
+    fields = input(f"Input fields to show separated by commas, or 'None' ({view['fields']}): ")
+    while (fields not in ["", "None"] and any([field not in table.schema.fieldIndexes for field in fields.split(",")])):
+        print("Invalid. Try again (it is the name of the field, not index)")
+        fields = input(f"Input fields to show separated by commas, or 'None' ({view['fields']}): ")
+
+    if (fields != ""):
+        view["fields"] = None if fields == "None" else fields.split(",")
+
+    # Gets whether the table is shown again after each create, delete, amend and search
+    redraw = input(f"Show the table again after each action? (Y/N) ({'Y' if view['redraw'] else 'N'}): ")
+    if (redraw != ""):
+        view["redraw"] = redraw.lower() in ["yes", "y"]
+
 # This goes through the process of creating a record with the user
 def createRecordProcess(table, account=0):
 
@@ -1085,115 +3749,64 @@ def createRecordProcess(table, account=0):
     parameters = []
     print("Enter parameters: ")
 
-    # Gets the data for each field for the table skipping the first element
-    # since the first element is auto generated (primary key)
-    fieldsData = table.tableFieldData[1:len(table.tableFieldData)]
-
-    # Iterates through each field's data
-    for data in fieldsData:
-
-        # Combines them into a dictionary for easy use
-        fieldData = {
-            "name": data[0],
-            "keyType": data[1][0],
-            "classType": data[1][1],
-            "maxLength": data[1][2],
-            "defaultValue": data[1][3],
-            "additionalValidation": data[1][4],
-            "isRequired": data[1][5]
-        }
-
-        # If there is additional validation, assign extra data
-        if (fieldData["additionalValidation"] != ""):
-            fieldData["validationType"] = data[1][4][0]
-            fieldData["argument"] = data[1][4][1]
+    # Iterates through each field of the table, skipping the first field since the first field is auto generated
+    # (primary key)
+    for field in table.schema.fields[1:]:
 
         # Check for a default value, if not empty, alert the user
-        if (fieldData["defaultValue"] != ""):
-            print(f"This parameter has a default of {fieldData['defaultValue']}. Enter empty to leave it at default.")
+        if (field.defaultValue != ""):
+            print(f"This parameter has a default of {field.defaultValue}. Enter empty to leave it at default.")
 
         # Check is the parameter is not required, if so, alert the user
-        if (fieldData["isRequired"] == False):
-            print(f"This parameter ({fieldData['defaultValue']}) is not required. Enter empty to leave it at 'None'.")
+        if (field.required == False):
+            print(f"This parameter ({field.defaultValue}) is not required. Enter empty to leave it at 'None'.")
 
-        if (fieldData["additionalValidation"] != ""):
-            if (fieldData["argument"] == "position"):
-                print("This parameter has the select choices of 'Manager', 'Counter Attendant', 'Repairman', and 'Maintenance'.")
+        if (field.validation == ["format", "position"]):
+            print("This parameter has the select choices of 'Manager', 'Counter Attendant', 'Repairman', and 'Maintenance'.")
 
-            if (fieldData["argument"] == "address"):
-                print("This parameter has the format of: (Street Num) (Residential Name) (Residence Type) (City) (Outcode) (Incode)")
+        if (field.validation == ["format", "address"]):
+            print("This parameter has the format of: (Street Num) (Residential Name) (Residence Type) (City) (Outcode) (Incode)")
 
         # Get input value for field
-        print(f"What is the {fieldData['name']}? ")
+        print(f"What is the {field.name}? ")
         attribute = input()
 
-        # If input is empty and default value is not empty, append default value and go to the next field to input
-        if (attribute == "" and fieldData["defaultValue"] != ""):
-            parameters.append(str(fieldData["defaultValue"]))
-            continue
-
-        # If input is empty and field value is not required, append "None" and go to the next field to input
-        if (attribute == "" and fieldData["isRequired"] == False):
-            parameters.append("None")
+        # If input is empty and the field has a value for being empty (its default value, or "None" if it is not
+        # required), append that value and go to the next field to input
+        if (attribute == "" and field.emptyValue is not None):
+            parameters.append(field.emptyValue)
             continue
 
-        # If the field is a foreign key, make sure that the primary key exists
-        if (fieldData["keyType"] == "F"):
-            while foreignKeyCheck(attribute, fieldData['name']) == False:
-                print("Invalid Key, please try again.")
-                print(f"What is the {fieldData['name']}? ")
-                attribute = input()
-
-        # Check that the type is correct with the field data
-        while typeCheck(attribute, fieldData["classType"]) == False:
-                print("Invalid Type, please try again.")
-                print(f"What is the {fieldData['name']}? ")
-                attribute = input()
-
-        # Check that the length is within the max length in field data
-        while lengthCheck(attribute, fieldData["maxLength"]) == False:
-            print("Invalid Length, please try again.")
-            print(f"What is the {fieldData['name']}? ")
-            attribute = input()
-
-        # Additional validation
-        if (fieldData["additionalValidation"] != ""):
-
-            # Validate the input with its respective format check
-            if (fieldData["validationType"] == "format"):
-                while formatCheck(attribute, fieldData["argument"]) == False:
-                    print("Invalid Format, please try again.")
-                    print(f"What is the {fieldData['name']}? ")
-                    attribute = input()
-
-            # Validate the input with its respective range check
-            if (fieldData["validationType"] == "range"):
-
-                attribute = int(attribute) if fieldData["classType"] is int else float(attribute)
-
-                while rangeCheck(attribute, fieldData["argument"]) == False:
-                    print("Invalid Range, please try again.")
-                    print(f"What is the {fieldData['name']}? ")
-                    attribute = input()
+        # If all checks are passed, append the attribute to list
+        parameters.append(validatedInput(field, attribute))
 
-                    attribute = int(attribute) if fieldData["classType"] is int else float(attribute)
+    # After getting all the data, create record, and make the transactionHistory record in the same transaction so that
+    # they are written together
+    with Table.measure("createRecordProcess"), Table.transaction():
+        stockID = table.createRecord(parameters)
 
-                # Convert attribute back to string
-                attribute = str(attribute)
+        if (table.tableName == "Stocks" and stockID is not None):
+            transactionHistoryAmend(account, stockID, f"'Created Record '{parameters[0]}'.'")
 
-        # If all checks are passed, append the attribute to list
-        parameters.append(attribute)
+# This function checks a value the user entered for a field with each of the field's checks, asking the user for the
+# value again until it passes all of them, and returns the value as it is stored
+def validatedInput(field, attribute):
 
-    # After getting all the data, create record
-    table.createRecord(parameters)
+    failedCheck = field.validate(attribute)
+    while (failedCheck is not None):
+        print(f"Invalid {failedCheck}, please try again.")
+        print(f"What is the {field.name}? ")
+        attribute = input()
+        failedCheck = field.validate(attribute)
 
-    # Make transactionHistory record
-    if (table.tableName == "Stocks"):
-        transactionHistoryAmend(account, table.findRecord("stockName", parameters[0])[0], f"'Created Record '{parameters[0]}'.'")
+    return field.normalise(attribute)
 
 # This goes through the process of amending a record with the user
 def amendRecordProcess(table, account, index=None, field=None, attribute=None):
 
+    # Gets the version of the database, to check that no other terminal changes it before the record is amended
+    version = Table.databaseVersion()
+
     # If index already specified, do not request an input from user
     if (index == None):
         # Get the index of record to amend
@@ -1208,106 +3821,53 @@ def amendRecordProcess(table, account, index=None, field=None, attribute=None):
 
         # Attempts to get a valid field name
         field = input()
-        while (field not in listOfFields):
+        while (field not in table.schema.fieldIndexes):
             print("Invalid. Try again (it is the name of the field, not index)")
             field = input()
 
-    # Gets the relevant field data by the name of the field
-    fieldsData = table.tableFieldData[[fieldData[0] for fieldData in table.tableFieldData].index(field)]
-
-    # Combines them into a dictionary for easy use
-    fieldData = {
-        "name": fieldsData[0],
-        "keyType": fieldsData[1][0],
-        "classType": fieldsData[1][1],
-        "maxLength": fieldsData[1][2],
-        "defaultValue": fieldsData[1][3],
-        "additionalValidation": fieldsData[1][4],
-        "isRequired": fieldsData[1][5]
-    }
-
-    # If there is additional validation, assign extra data
-    if (fieldData["additionalValidation"] != ""):
-        fieldData["validationType"] = fieldsData[1][4][0]
-        fieldData["argument"] = fieldsData[1][4][1]
+    # Gets the compiled field by its name
+    fieldData = table.schema.field(field)
 
     # If attribute already specified, do not request an input from user
     if (attribute == None):
 
         # If input is empty and default value is not empty, append default value and go to the next field to input
-        if (fieldData["defaultValue"] != ""):
-            print(f"This parameter has a default of {fieldData['defaultValue']}. Enter empty to leave it at default.")
+        if (fieldData.defaultValue != ""):
+            print(f"This parameter has a default of {fieldData.defaultValue}. Enter empty to leave it at default.")
 
         # If input is empty and field value is not required, append "None" and go to the next field to input
-        if (fieldData["isRequired"] == False):
-            print(f"This parameter ({fieldData['defaultValue']}) is not required. Enter empty to leave it at 'None'.")
+        if (fieldData.required == False):
+            print(f"This parameter ({fieldData.defaultValue}) is not required. Enter empty to leave it at 'None'.")
 
         # Gets the value to amend the field with
         print(f"Change the value in {field} to: ")
         attribute = input()
 
-    # If input is empty and default value is not empty, append default value and go to the next field to input
-    if (attribute == "" and fieldData["defaultValue"] != ""):
-        attribute = fieldData["defaultValue"]
-
-    # If input is empty and field value is not required, append "None" and go to the next field to input
-    if (attribute == "" and fieldData["isRequired"] == False):
-        attribute = "None"
-
-    # If the field is a foreign key, make sure that the primary key exists
-    if (fieldData["keyType"] == "F"):
-        while foreignKeyCheck(attribute, fieldData['name']) == False:
-            print("Invalid Key, try again.")
-            print(f"What is the {fieldData['name']}? ")
-            attribute = input()
-
-    # Check that the type is correct with the field data
-    while typeCheck(attribute, fieldData["classType"]) == False:
-        print("Invalid Type, try again.")
-        print(f"What is the {fieldData['name']}? ")
-        attribute = input()
-
-    # Check that the length is within the max length in field data
-    while lengthCheck(attribute, fieldData["maxLength"]) == False:
-        print("Invalid Length, try again.")
-        print(f"What is the {fieldData['name']}? ")
-        attribute = input()
-
-    # Additional validation
-    if (fieldData["additionalValidation"] != ""):
-
-        # Validate the input with its respective format check
-        if (fieldData["validationType"] == "format"):
-            while formatCheck(attribute, fieldData["argument"]) == False:
-                print("Invalid Format, try again.")
-                print(f"What is the {fieldData['name']}? ")
-                attribute = input()
-
-        # Validate the input with its respective range check
-        if (fieldData["validationType"] == "range"):
-
-            attribute = int(attribute) if fieldData["classType"] is int else float(attribute)
-
-            while rangeCheck(attribute, fieldData["argument"]) == False:
-                print("Invalid Range, try again.")
-                print(f"What is the {fieldData['name']}? ")
-                attribute = input()
+    # If input is empty, use the field's value for being empty (its default value, or "None" if it is not required).
+    # Otherwise, the value is checked, asking the user again until it passes every check of the field
+    if (attribute == "" and fieldData.emptyValue is not None):
+        attribute = fieldData.emptyValue
+    else:
+        attribute = validatedInput(fieldData, attribute)
 
-                attribute = int(attribute) if fieldData["classType"] is int else float(attribute)
+    # Amends the record, and makes the transactionHistory record in the same transaction, then goes back to table screen
+    with Table.measure("amendRecordProcess"), Table.transaction():
 
-            # Convert attribute back to string
-            attribute = str(attribute)
+        # If another terminal changed the database whilst the user was choosing, the record may have moved
+        if (Table.databaseVersion() != version):
+            return print("The database was changed by another terminal. Please try again.")
 
-    # Amends the record, then goes back to table screen
-    table.amendRecord(index, field, attribute)
+        stockID = table.amendRecord(index, field, attribute)
 
-    # Make transactionHistory record
-    if (table.tableName == "Stocks"):
-        transactionHistoryAmend(account, table.findRecord(field, attribute)[0], f"'Amended Record '{table.findRecord(field, attribute)[0]}'s {field} to: {attribute}'.'")
+        if (table.tableName == "Stocks" and stockID is not None):
+            transactionHistoryAmend(account, stockID, f"'Amended Record '{stockID}'s {field} to: {attribute}'.'")
 
 # This goes through the process of deleting a record with the user
 def deleteRecordProcess(table, account):
 
+    # Gets the version of the database, to check that no other terminal changes it before the record is deleted
+    version = Table.databaseVersion()
+
     # Select the index of the record to remove
     print("Select index of record: ")
     index = input()
@@ -1317,37 +3877,21 @@ def deleteRecordProcess(table, account):
         index = int(index)
     except:
         print("Input is not an integer. Please try again.")
-        deleteRecordProcess(table, account)
+        return deleteRecordProcess(table, account)
 
     # Checks to see if a valid input is made (is between the valid range of options)
     if (index > table.tableLength()-1 or index < 0):
         print("Input is not in range. Please try again.")
-        deleteRecordProcess(table, account)
-
-    # Gets the primary field of the selected table
-    primaryField = table.tableFieldData[0][0]
+        return deleteRecordProcess(table, account)
 
-    # Searches through the enumeration of table data for records that may be affected by the deletion of the current record
-    affectedRecords = []
-    for tableID in range(len(Table.enumOfTableData)):
-        for field in Table.enumOfTableData[tableID]['fields']:
-            # Check if field is the same as the primary key field but it is a foriegn key
-            if (field[0] == primaryField and field[1][0] == "F"):
-
-                # Get the table name, the table, and attempt to find the record
-                tableName = Table.enumOfTableData[tableID]["name"]
-                aTable = Table(tableName)
-                foundRecord = aTable.findRecord(primaryField, index)
-
-                # If found, append to affected records to alert the user
-                if (foundRecord != -1):
-                    affectedRecords.append([tableName, foundRecord])
+    # Finds every record in the other tables that refers to the record being deleted, which may be affected by the deletion
+    affectedRecords = table.findDependents(index)
 
     # Alert the user if there are any affected records
     if (len(affectedRecords) > 0):
         print("Warning! This deletion will also delete the following records:")
         for affectedData in affectedRecords:
-            print(f"({affectedData[0]}): {affectedData[1]}")
+            print(f"({affectedData[0].tableName}): {affectedData[2]}")
 
     # Verify with user whether they wish to delete the record(s)
     print("\nAre you sure you want to delete this record? (Y/N)")
@@ -1356,21 +3900,32 @@ def deleteRecordProcess(table, account):
     if (confirmation.lower() not in ["yes", "y"]):
         return print("Cancelled deletion.")
 
-    # Iterate through each record and delete them in their respective tables
-    for toDeleteData in affectedRecords:
-        dTable = Table(toDeleteData[0])
-        dTable.deleteRecord(int(toDeleteData[1][0]))
+    # The affected records, the record, and the transactionHistory record are all written in the same transaction, so
+    # either all of them are made or none of them are
+    with Table.measure("deleteRecordProcess"), Table.transaction():
+
+        # If another terminal changed the database whilst the user was choosing, the record may have moved
+        if (Table.databaseVersion() != version):
+            return print("The database was changed by another terminal. Please try again.")
+
+        # Group the affected records by their table, then delete each table's records together by their positions
+        affectedTables = {}
+        for toDeleteData in affectedRecords:
+            affectedTables.setdefault(toDeleteData[0].tableName, [toDeleteData[0], []])[1].append(toDeleteData[1])
 
-    # Delete the record, then go back to table screen
-    table.deleteRecord(index)
+        for dTable, positions in affectedTables.values():
+            dTable.deleteRecords(positions)
+
+        # Delete the record, then go back to table screen
+        stockID = table.deleteRecord(index)
+
+        # Make transactionHistory record
+        if (table.tableName == "Stocks"):
+            transactionHistoryAmend(account, stockID, f"'Deleted Record '{stockID}'.'")
 
     # Inform user
     print("Successfully deleted record(s).")
 
-    # Make transactionHistory record
-    if (table.tableName == "Stocks"):
-        transactionHistoryAmend(account, index, f"'Deleted Record '{index}'.'")
-
 # This function goes through the process of searching for a record with the user
 def searchRecordProcess(table):
 
@@ -1380,30 +3935,33 @@ def searchRecordProcess(table):
 
     # Attempts to get a valid field name
     field = input()
-    while (field not in listOfFields):
+    while (field not in table.schema.fieldIndexes):
         print("Invalid. Try again (it is the name of the field, not index)")
         field = input()
 
     # Gets the search value
     searchValue = input("Input search value: ")
 
-    # Searches for the record
-    record = table.findRecord(field, searchValue)
+    # Searches for the records, printing each one as soon as it is found
+    recordCount = 0
+    with Table.measure("searchRecordProcess"):
+        for record in table.iterRecords({field: searchValue}):
+            print(" ".join(record))
+            recordCount += 1
 
-    # If not found, return failure message, else, print it
-    if (record == -1):
+    # If not found, return failure message
+    if (recordCount == 0):
         print(f"Record wasn't found. Did you mean to type '{searchValue}'")
-    else:
-        print(" ".join(record))
 
 # This function is used to add records to the transaction history automatically
 def transactionHistoryAmend(account, stockID, change):
     # Get transaction table
     transactionTable = Table("Transaction History")
 
-    # Get accountID, then create record
+    # Get accountID, then create record with the fields in the order of the table
     accountID = account["account"][0]
-    transactionTable.createRecord([accountID, stockID, change])
+    transactionTable.createRecord([str(stockID), accountID, change])
 
-# Start the program
-main()
+# Start the program, but only when this file is run, rather than imported (such as by the benchmark)
+if (__name__ == "__main__"):
+    main()